@@ -0,0 +1,23 @@
+"""Преобразования между protobuf-сообщениями и структурами сервиса."""
+
+import itertools
+from operator import attrgetter
+
+import numpy as np
+
+_get_values = attrgetter("values")
+
+
+def features_to_ndarray(pb_features) -> np.ndarray:
+    """Собрать матрицу признаков из repeated FeatureVector без промежуточных списков."""
+    rows = list(map(_get_values, pb_features))
+    n_samples = len(rows)
+    if n_samples == 0:
+        return np.empty((0, 0), dtype=np.float64)
+    n_features = len(rows[0])
+    if any(len(row) != n_features for row in rows):
+        raise ValueError("Все векторы признаков должны иметь одинаковую длину")
+    values = itertools.chain.from_iterable(rows)
+    return np.fromiter(values, dtype=np.float64, count=n_samples * n_features).reshape(
+        n_samples, n_features
+    )
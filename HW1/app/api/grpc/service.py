@@ -1,19 +1,230 @@
 """gRPC сервис для ML Service."""
 
+import asyncio
+import functools
+import io
+import re
+import tempfile
 import grpc
+import numpy as np
+from collections import defaultdict
 from concurrent import futures
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import ml_service_pb2
 import ml_service_pb2_grpc
+from app.api.grpc.converters import features_to_ndarray
 from app.services.model_service import model_service
-from app.services.dataset_service import dataset_service
+from app.services.dataset_service import DatasetRecord, get_dataset_service
+from app.core.config import settings
 from app.core.logging import logger
+from app.core.predict_cache import predict_cache
+
+_is_int = re.compile(r"[-+]?\d+").fullmatch
+_is_float = re.compile(r"[-+]?(?:(?:\d+\.\d*|\.\d+)(?:[eE][-+]?\d+)?|\d+[eE][-+]?\d+)").fullmatch
+
+_UPLOAD_SPOOL_SIZE = 1024 * 1024
+
+_COMPRESSION = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
+_executor = futures.ThreadPoolExecutor(max_workers=settings.grpc_max_workers)
+
+
+async def _run_blocking(func: Callable, *args, **kwargs):
+    """Выполнить блокирующий вызов сервиса в пуле потоков, не блокируя event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+def _parse_hyperparameters(pb_hyperparameters) -> Dict[str, Any]:
+    """Привести строковые гиперпараметры из protobuf map к int/float."""
+    return {
+        key: int(value) if _is_int(value) else float(value) if _is_float(value) else value
+        for key, value in pb_hyperparameters.items()
+    }
+
+
+def _format_created_at(created_at) -> str:
+    """Привести дату создания к строке для protobuf."""
+    if isinstance(created_at, datetime):
+        return created_at.isoformat()
+    return created_at or ''
+
+
+def _to_pb_model(model: Dict[str, Any]) -> ml_service_pb2.ModelInfo:
+    """Собрать protobuf ModelInfo из словаря с информацией о модели."""
+    get = model.get
+    pb_model = ml_service_pb2.ModelInfo(
+        model_id=get('model_id', ''),
+        model_type=get('model_type', ''),
+        dataset_id=get('dataset_id', ''),
+        created_at=_format_created_at(get('created_at')),
+        status=get('status', ''),
+    )
+    pb_hyperparameters = pb_model.hyperparameters
+    for key, value in (get('hyperparameters') or {}).items():
+        pb_hyperparameters[key] = str(value)
+    return pb_model
+
+
+def _to_pb_dataset(dataset: DatasetRecord) -> ml_service_pb2.DatasetInfo:
+    """Собрать protobuf DatasetInfo из записи о датасете."""
+    return ml_service_pb2.DatasetInfo(
+        dataset_id=dataset.dataset_id,
+        filename=dataset.file_name,
+        size=dataset.size,
+        created_at=_format_created_at(dataset.created_at),
+        dvc_version=dataset.dvc_version or '',
+    )
+
+
+class PredictBatcher:
+    """Объединяет одновременные запросы Predict к одной модели в один вызов predict."""
+
+    def __init__(self, window: float, max_batch_size: int):
+        """
+        Инициализация батчера.
+
+        Args:
+            window: Окно ожидания запросов для батча в секундах
+            max_batch_size: Максимальное количество запросов в батче
+        """
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    async def predict(self, model_id: str, features: np.ndarray) -> List[float]:
+        """
+        Поставить запрос в очередь и дождаться предсказаний.
+
+        Args:
+            model_id: ID модели
+            features: Признаки для предсказания
+
+        Returns:
+            Список предсказаний
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((model_id, features, future))
+        return await future
+
+    async def stop(self):
+        """Остановить фоновую задачу батчера."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _collect(self) -> List[Tuple[str, np.ndarray, asyncio.Future]]:
+        """Собрать батч запросов в пределах окна ожидания."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self._window
+        while len(batch) < self._max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        """Фоновый цикл: группировать запросы по модели и размерности признаков."""
+        while True:
+            batch = await self._collect()
+            groups = defaultdict(list)
+            for item in batch:
+                model_id, features, _ = item
+                groups[(model_id, features.shape[1])].append(item)
+            if len(groups) > 1 and len({model_id for model_id, _ in groups}) == len(groups):
+                self._spawn(self._predict_models({model_id: items for (model_id, _), items in groups.items()}))
+                continue
+            for (model_id, _), items in groups.items():
+                self._spawn(self._predict_group(model_id, items))
+
+    def _spawn(self, coro):
+        """Запустить задачу и держать на нее ссылку до завершения."""
+        task = asyncio.create_task(coro)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _predict_models(self, items_by_model: Dict[str, list]):
+        """
+        Выполнить predict_batch для батча из нескольких моделей.
+
+        Незагруженные модели подгружаются параллельно. При ошибке каждая группа
+        повторяется отдельно, чтобы ошибка досталась только своим запросам.
+        """
+        features_by_model = {
+            model_id: np.vstack([features for _, features, _ in items])
+            for model_id, items in items_by_model.items()
+        }
+        try:
+            predictions = await _run_blocking(model_service.predict_batch, features_by_model)
+        except Exception:
+            await asyncio.gather(*(
+                self._predict_group(model_id, items) for model_id, items in items_by_model.items()
+            ))
+            return
+        for model_id, items in items_by_model.items():
+            self._resolve(items, predictions[model_id])
+
+    async def _predict_group(self, model_id: str, items: list):
+        """Выполнить один вызов predict для группы запросов и раздать результаты."""
+        stacked = np.vstack([features for _, features, _ in items])
+        try:
+            predictions = await _run_blocking(model_service.predict, model_id, stacked)
+        except Exception as e:
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self._resolve(items, predictions)
+
+    @staticmethod
+    def _resolve(items: list, predictions: List[float]):
+        """Раздать предсказания объединенного вызова по запросам группы."""
+        offset = 0
+        for _, features, future in items:
+            end = offset + len(features)
+            if not future.done():
+                future.set_result(list(predictions[offset:end]))
+            offset = end
+
+
+predict_batcher = PredictBatcher(
+    window=settings.grpc_predict_batch_window_ms / 1000,
+    max_batch_size=settings.grpc_predict_max_batch_size,
+)
+
+
+async def _predict(model_id: str, features: np.ndarray) -> List[float]:
+    """Получить предсказания с учетом кэша и микро-батчинга."""
+    cache_key = predict_cache.make_key(model_id, features)
+    predictions = predict_cache.get(cache_key)
+    if predictions is None:
+        if len(features):
+            predictions = await predict_batcher.predict(model_id, features)
+        else:
+            predictions = await _run_blocking(model_service.predict, model_id, features)
+        predict_cache.set(cache_key, predictions)
+    return predictions
 
 
 class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
     """Реализация gRPC сервиса для ML Service."""
 
-    def HealthCheck(self, request, context):
+    async def HealthCheck(self, request, context):
         """Проверка статуса сервиса."""
         logger.info("gRPC: Проверка здоровья сервиса")
         return ml_service_pb2.HealthCheckResponse(
@@ -21,7 +232,7 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
             version="0.1.0"
         )
 
-    def GetAvailableModels(self, request, context):
+    async def GetAvailableModels(self, request, context):
         """Получить список доступных типов моделей."""
         logger.info("gRPC: Запрос списка доступных моделей")
         model_types = model_service.get_available_model_types()
@@ -29,27 +240,16 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
             model_types=model_types
         )
 
-    def GetModels(self, request, context):
+    async def GetModels(self, request, context):
         """Получить список всех моделей."""
         logger.info("gRPC: Запрос списка моделей")
         models = model_service.get_all_models()
         
-        pb_models = []
-        for model in models:
-            hyperparams = {k: str(v) for k, v in model.get('hyperparameters', {}).items()}
-            pb_model = ml_service_pb2.ModelInfo(
-                model_id=model.get('model_id', ''),
-                model_type=model.get('model_type', ''),
-                dataset_id=model.get('dataset_id', ''),
-                hyperparameters=hyperparams,
-                created_at=model.get('created_at', ''),
-                status=model.get('status', ''),
-            )
-            pb_models.append(pb_model)
-        
-        return ml_service_pb2.GetModelsResponse(models=pb_models)
+        response = ml_service_pb2.GetModelsResponse()
+        response.models.extend(map(_to_pb_model, models))
+        return response
 
-    def TrainModel(self, request, context):
+    async def TrainModel(self, request, context):
         """Обучить модель."""
         logger.info(
             "gRPC: Запрос на обучение модели",
@@ -57,19 +257,12 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
         )
         
         try:
-            X, y = dataset_service.load_dataset(request.dataset_id)
+            X, y = await _run_blocking(get_dataset_service().load_dataset, request.dataset_id)
             
-            hyperparameters = {}
-            for key, value in request.hyperparameters.items():
-                try:
-                    if '.' in value:
-                        hyperparameters[key] = float(value)
-                    else:
-                        hyperparameters[key] = int(value)
-                except ValueError:
-                    hyperparameters[key] = value
+            hyperparameters = _parse_hyperparameters(request.hyperparameters)
             
-            model_id = model_service.train_model(
+            model_id = await _run_blocking(
+                model_service.train_model,
                 model_type=request.model_type,
                 dataset_id=request.dataset_id,
                 hyperparameters=hyperparameters,
@@ -83,17 +276,7 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
                 context.set_details("Ошибка при создании модели")
                 return ml_service_pb2.TrainModelResponse()
             
-            hyperparams = {k: str(v) for k, v in model_info.get('hyperparameters', {}).items()}
-            pb_model = ml_service_pb2.ModelInfo(
-                model_id=model_info.get('model_id', ''),
-                model_type=model_info.get('model_type', ''),
-                dataset_id=model_info.get('dataset_id', ''),
-                hyperparameters=hyperparams,
-                created_at=model_info.get('created_at', ''),
-                status=model_info.get('status', ''),
-            )
-            
-            return ml_service_pb2.TrainModelResponse(model=pb_model)
+            return ml_service_pb2.TrainModelResponse(model=_to_pb_model(model_info))
         except ValueError as e:
             logger.error(f"gRPC: Ошибка при обучении модели: {str(e)}")
             context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
@@ -105,14 +288,14 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
             context.set_details(f"Внутренняя ошибка: {str(e)}")
             return ml_service_pb2.TrainModelResponse()
 
-    def Predict(self, request, context):
+    async def Predict(self, request, context):
         """Получить предсказания от модели."""
         logger.info("gRPC: Запрос на получение предсказаний")
         
         try:
-            features = [list(f.values) for f in request.features]
+            features = features_to_ndarray(request.features)
             
-            predictions = model_service.predict(request.model_id, features)
+            predictions = await _predict(request.model_id, features)
             
             return ml_service_pb2.PredictResponse(
                 predictions=predictions,
@@ -129,24 +312,37 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
             context.set_details(f"Внутренняя ошибка: {str(e)}")
             return ml_service_pb2.PredictResponse()
 
-    def RetrainModel(self, request, context):
+    async def PredictStream(self, request_iterator, context):
+        """Получить предсказания в потоковом режиме."""
+        logger.info("gRPC: Потоковый запрос на получение предсказаний")
+        
+        async for request in request_iterator:
+            try:
+                features = features_to_ndarray(request.features)
+                predictions = await _predict(request.model_id, features)
+            except ValueError as e:
+                logger.error(f"gRPC: Ошибка при получении предсказаний: {str(e)}")
+                await context.abort(grpc.StatusCode.NOT_FOUND, str(e))
+            except Exception as e:
+                logger.error(f"gRPC: Неожиданная ошибка при получении предсказаний: {str(e)}")
+                await context.abort(grpc.StatusCode.INTERNAL, f"Внутренняя ошибка: {str(e)}")
+            
+            yield ml_service_pb2.PredictResponse(
+                predictions=predictions,
+                model_id=request.model_id
+            )
+
+    async def RetrainModel(self, request, context):
         """Переобучить модель."""
         logger.info("gRPC: Запрос на переобучение модели")
         
         try:
-            X, y = dataset_service.load_dataset(request.dataset_id)
+            X, y = await _run_blocking(get_dataset_service().load_dataset, request.dataset_id)
             
-            hyperparameters = {}
-            for key, value in request.hyperparameters.items():
-                try:
-                    if '.' in value:
-                        hyperparameters[key] = float(value)
-                    else:
-                        hyperparameters[key] = int(value)
-                except ValueError:
-                    hyperparameters[key] = value
+            hyperparameters = _parse_hyperparameters(request.hyperparameters)
             
-            new_model_id = model_service.retrain_model(
+            new_model_id = await _run_blocking(
+                model_service.retrain_model,
                 model_id=request.model_id,
                 dataset_id=request.dataset_id,
                 hyperparameters=hyperparameters,
@@ -160,17 +356,7 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
                 context.set_details("Ошибка при создании модели")
                 return ml_service_pb2.RetrainModelResponse()
             
-            hyperparams = {k: str(v) for k, v in model_info.get('hyperparameters', {}).items()}
-            pb_model = ml_service_pb2.ModelInfo(
-                model_id=model_info.get('model_id', ''),
-                model_type=model_info.get('model_type', ''),
-                dataset_id=model_info.get('dataset_id', ''),
-                hyperparameters=hyperparams,
-                created_at=model_info.get('created_at', ''),
-                status=model_info.get('status', ''),
-            )
-            
-            return ml_service_pb2.RetrainModelResponse(model=pb_model)
+            return ml_service_pb2.RetrainModelResponse(model=_to_pb_model(model_info))
         except ValueError as e:
             logger.error(f"gRPC: Ошибка при переобучении модели: {str(e)}")
             context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
@@ -182,11 +368,11 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
             context.set_details(f"Внутренняя ошибка: {str(e)}")
             return ml_service_pb2.RetrainModelResponse()
 
-    def DeleteModel(self, request, context):
+    async def DeleteModel(self, request, context):
         """Удалить модель."""
         logger.info("gRPC: Запрос на удаление модели")
         
-        success = model_service.delete_model(request.model_id)
+        success = await _run_blocking(model_service.delete_model, request.model_id)
         if not success:
             context.set_code(grpc.StatusCode.NOT_FOUND)
             context.set_details(f"Модель {request.model_id} не найдена")
@@ -200,25 +386,16 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
             message=f"Модель {request.model_id} успешно удалена"
         )
 
-    def GetDatasets(self, request, context):
+    async def GetDatasets(self, request, context):
         """Получить список всех датасетов."""
         logger.info("gRPC: Запрос списка датасетов")
-        datasets = dataset_service.get_all_datasets()
-        
-        pb_datasets = []
-        for dataset in datasets:
-            pb_dataset = ml_service_pb2.DatasetInfo(
-                dataset_id=dataset.get('dataset_id', ''),
-                filename=dataset.get('file_name', ''),
-                size=dataset.get('size', 0),
-                created_at=dataset.get('created_at', ''),
-                dvc_version=dataset.get('dvc_version', ''),
-            )
-            pb_datasets.append(pb_dataset)
+        datasets = get_dataset_service().get_all_datasets()
         
-        return ml_service_pb2.GetDatasetsResponse(datasets=pb_datasets)
+        response = ml_service_pb2.GetDatasetsResponse()
+        response.datasets.extend(map(_to_pb_dataset, datasets))
+        return response
 
-    def UploadDataset(self, request, context):
+    async def UploadDataset(self, request, context):
         """Загрузить датасет."""
         logger.info("gRPC: Запрос на загрузку датасета")
         
@@ -228,38 +405,75 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
             return ml_service_pb2.UploadDatasetResponse()
         
         try:
-            dataset_id = dataset_service.upload_dataset(
+            dataset_id = await _run_blocking(
+                get_dataset_service().upload_dataset,
                 request.filename,
-                request.content,
+                io.BytesIO(request.content),
                 request.format
             )
             
-            dataset_info = dataset_service.get_dataset(dataset_id)
+            dataset_info = get_dataset_service().get_dataset(dataset_id)
             if not dataset_info:
                 context.set_code(grpc.StatusCode.INTERNAL)
                 context.set_details("Ошибка при загрузке датасета")
                 return ml_service_pb2.UploadDatasetResponse()
             
-            pb_dataset = ml_service_pb2.DatasetInfo(
-                dataset_id=dataset_info.get('dataset_id', ''),
-                filename=dataset_info.get('file_name', ''),
-                size=dataset_info.get('size', 0),
-                created_at=dataset_info.get('created_at', ''),
-                dvc_version=dataset_info.get('dvc_version', ''),
-            )
-            
-            return ml_service_pb2.UploadDatasetResponse(dataset=pb_dataset)
+            return ml_service_pb2.UploadDatasetResponse(dataset=_to_pb_dataset(dataset_info))
         except Exception as e:
             logger.error(f"gRPC: Ошибка при загрузке датасета: {str(e)}")
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(f"Внутренняя ошибка: {str(e)}")
             return ml_service_pb2.UploadDatasetResponse()
 
-    def DeleteDataset(self, request, context):
+    async def UploadDatasetStream(self, request_iterator, context):
+        """Загрузить датасет частями."""
+        logger.info("gRPC: Потоковый запрос на загрузку датасета")
+        
+        filename = ""
+        format = ""
+        size = 0
+        with tempfile.SpooledTemporaryFile(max_size=_UPLOAD_SPOOL_SIZE) as buffer:
+            async for chunk in request_iterator:
+                filename = filename or chunk.filename
+                format = format or chunk.format
+                size += len(chunk.content)
+                if size > settings.grpc_max_upload_size:
+                    context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+                    context.set_details(
+                        f"Размер датасета превышает {settings.grpc_max_upload_size} байт"
+                    )
+                    return ml_service_pb2.UploadDatasetResponse()
+                buffer.write(chunk.content)
+            
+            if format not in ["csv", "json"]:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details("Поддерживаются только форматы csv и json")
+                return ml_service_pb2.UploadDatasetResponse()
+            
+            buffer.seek(0)
+            try:
+                dataset_id = await _run_blocking(
+                    get_dataset_service().upload_dataset, filename, buffer, format
+                )
+                
+                dataset_info = get_dataset_service().get_dataset(dataset_id)
+                if not dataset_info:
+                    context.set_code(grpc.StatusCode.INTERNAL)
+                    context.set_details("Ошибка при загрузке датасета")
+                    return ml_service_pb2.UploadDatasetResponse()
+                
+                return ml_service_pb2.UploadDatasetResponse(dataset=_to_pb_dataset(dataset_info))
+            except Exception as e:
+                logger.error(f"gRPC: Ошибка при загрузке датасета: {str(e)}")
+                context.set_code(grpc.StatusCode.INTERNAL)
+                context.set_details(f"Внутренняя ошибка: {str(e)}")
+                return ml_service_pb2.UploadDatasetResponse()
+
+    async def DeleteDataset(self, request, context):
         """Удалить датасет."""
         logger.info("gRPC: Запрос на удаление датасета")
         
-        success = dataset_service.delete_dataset(request.dataset_id)
+        success = await _run_blocking(get_dataset_service().delete_dataset, request.dataset_id)
         if not success:
             context.set_code(grpc.StatusCode.NOT_FOUND)
             context.set_details(f"Датасет {request.dataset_id} не найден")
@@ -274,19 +488,22 @@ class MLServiceServicer(ml_service_pb2_grpc.MLServiceServicer):
         )
 
 
-def serve(port: int = 50051):
+async def serve(port: int = 50051):
     """Запустить gRPC сервер."""
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.aio.server(
+        options=[("grpc.max_concurrent_streams", settings.grpc_max_concurrent_streams)],
+        compression=_COMPRESSION.get(settings.grpc_compression, grpc.Compression.NoCompression),
+    )
     ml_service_pb2_grpc.add_MLServiceServicer_to_server(
         MLServiceServicer(), server
     )
     server.add_insecure_port(f'[::]:{port}')
-    server.start()
+    await server.start()
     logger.info(f"gRPC сервер запущен на порту {port}")
     
     try:
-        server.wait_for_termination()
-    except KeyboardInterrupt:
+        await server.wait_for_termination()
+    except asyncio.CancelledError:
         logger.info("Остановка gRPC сервера")
-        server.stop(0)
-
+        await predict_batcher.stop()
+        await server.stop(0)
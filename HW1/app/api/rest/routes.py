@@ -1,6 +1,14 @@
 """REST API эндпоинты."""
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+import numpy as np
+import orjson
+import pyarrow as pa
+import ml_service_pb2
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response
+from google.protobuf.message import DecodeError
+from pydantic import TypeAdapter, ValidationError
 from typing import List
 from app.schemas.models import (
     TrainRequest,
@@ -10,12 +18,30 @@ from app.schemas.models import (
     DatasetInfo,
     HealthResponse,
 )
+from app.api.grpc.converters import features_to_ndarray
 from app.services.model_service import model_service
-from app.services.dataset_service import dataset_service
+from app.services.dataset_service import get_dataset_service
 from app.core.logging import logger
+from app.core.predict_cache import predict_cache
 
 router = APIRouter(prefix="/api/v1", tags=["ML Service"])
 
+_model_list_adapter = TypeAdapter(List[ModelInfo])
+_dataset_list_adapter = TypeAdapter(List[DatasetInfo])
+
+_PROTOBUF_MEDIA_TYPE = "application/x-protobuf"
+_ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def _predict_cached(model_id: str, features) -> List[float]:
+    """Получить предсказания модели с использованием кэша."""
+    cache_key = predict_cache.make_key(model_id, features)
+    predictions = predict_cache.get(cache_key)
+    if predictions is None:
+        predictions = model_service.predict(model_id, features)
+        predict_cache.set(cache_key, predictions)
+    return predictions
+
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -36,7 +62,9 @@ async def get_models():
     """Получить список всех обученных моделей."""
     logger.info("Запрос списка моделей")
     models = model_service.get_all_models()
-    return [ModelInfo(**model) for model in models]
+    return Response(
+        _model_list_adapter.dump_json(_model_list_adapter.validate_python(models)), media_type="application/json"
+    )
 
 
 @router.post("/models/train", response_model=ModelInfo)
@@ -48,7 +76,7 @@ async def train_model(request: TrainRequest):
     )
 
     try:
-        X, y = dataset_service.load_dataset(request.dataset_id)
+        X, y = get_dataset_service().load_dataset(request.dataset_id)
 
         model_id = model_service.train_model(
             model_type=request.model_type,
@@ -62,7 +90,7 @@ async def train_model(request: TrainRequest):
         if not model_info:
             raise HTTPException(status_code=500, detail="Ошибка при создании модели")
 
-        return ModelInfo(**model_info)
+        return ModelInfo.model_validate(model_info)
     except ValueError as e:
         logger.error("Ошибка при обучении модели")
         raise HTTPException(status_code=400, detail=str(e))
@@ -71,13 +99,104 @@ async def train_model(request: TrainRequest):
         raise HTTPException(status_code=500, detail=f"Внутренняя ошибка: {str(e)}")
 
 
-@router.post("/models/{model_id}/predict", response_model=PredictResponse)
-async def predict(model_id: str, request: PredictRequest):
+@router.post(
+    "/models/{model_id}/predict",
+    response_model=PredictResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": PredictRequest.model_json_schema()}},
+            "required": True,
+        }
+    },
+)
+async def predict(model_id: str, request: Request):
     """Получить предсказания от модели."""
     logger.info("Запрос на получение предсказаний")
 
     try:
-        predictions = model_service.predict(model_id, request.features)
+        predict_request = PredictRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+    try:
+        predictions = _predict_cached(model_id, predict_request.features)
+        return PredictResponse(predictions=predictions, model_id=model_id)
+    except ValueError as e:
+        logger.error("Ошибка при получении предсказаний")
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error("Неожиданная ошибка при получении предсказаний")
+        raise HTTPException(status_code=500, detail=f"Внутренняя ошибка: {str(e)}")
+
+
+@router.post(
+    "/models/{model_id}/predict:binary",
+    response_class=Response,
+    responses={200: {"content": {_PROTOBUF_MEDIA_TYPE: {}}}},
+    openapi_extra={
+        "requestBody": {
+            "content": {_PROTOBUF_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}},
+            "required": True,
+        }
+    },
+)
+async def predict_binary(model_id: str, request: Request):
+    """Получить предсказания от модели, тело запроса и ответа - protobuf PredictRequest/PredictResponse."""
+    logger.info("Запрос на получение предсказаний (protobuf)")
+
+    try:
+        predict_request = ml_service_pb2.PredictRequest.FromString(await request.body())
+        features = features_to_ndarray(predict_request.features)
+    except (DecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Некорректное тело запроса: {str(e)}")
+    if features.size == 0:
+        raise HTTPException(status_code=400, detail="Признаки должны быть непустым двумерным массивом")
+
+    try:
+        predictions = _predict_cached(model_id, features)
+    except ValueError as e:
+        logger.error("Ошибка при получении предсказаний")
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error("Неожиданная ошибка при получении предсказаний")
+        raise HTTPException(status_code=500, detail=f"Внутренняя ошибка: {str(e)}")
+
+    response = ml_service_pb2.PredictResponse(predictions=predictions, model_id=model_id)
+    return Response(response.SerializeToString(), media_type=_PROTOBUF_MEDIA_TYPE)
+
+
+def _arrow_to_ndarray(payload: bytes) -> np.ndarray:
+    """Собрать матрицу признаков float64 из таблицы Arrow IPC (stream), по столбцу на признак."""
+    table = pa.ipc.open_stream(payload).read_all()
+    if table.num_columns == 0:
+        return np.empty((0, 0), dtype=np.float64)
+    columns = [column.to_numpy() for column in table.columns]
+    return np.column_stack(columns).astype(np.float64, copy=False)
+
+
+@router.post(
+    "/models/{model_id}/predict:arrow",
+    response_model=PredictResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {_ARROW_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}},
+            "required": True,
+        }
+    },
+)
+async def predict_arrow(model_id: str, request: Request):
+    """Получить предсказания от модели, признаки передаются таблицей Arrow IPC (stream)."""
+    logger.info("Запрос на получение предсказаний (Arrow)")
+
+    try:
+        features = _arrow_to_ndarray(await request.body())
+    except (pa.ArrowException, ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Некорректное тело запроса: {str(e)}")
+    if features.size == 0:
+        raise HTTPException(status_code=400, detail="Признаки должны быть непустым двумерным массивом")
+
+    try:
+        predictions = _predict_cached(model_id, features)
         return PredictResponse(predictions=predictions, model_id=model_id)
     except ValueError as e:
         logger.error("Ошибка при получении предсказаний")
@@ -97,10 +216,9 @@ async def retrain_model(
     logger.info("Запрос на переобучение модели")
 
     try:
-        import json
-        hyperparams_dict = json.loads(hyperparameters) if hyperparameters else {}
+        hyperparams_dict = orjson.loads(hyperparameters) if hyperparameters else {}
 
-        X, y = dataset_service.load_dataset(dataset_id)
+        X, y = get_dataset_service().load_dataset(dataset_id)
 
         new_model_id = model_service.retrain_model(
             model_id=model_id,
@@ -114,7 +232,7 @@ async def retrain_model(
         if not model_info:
             raise HTTPException(status_code=500, detail="Ошибка при создании модели")
 
-        return ModelInfo(**model_info)
+        return ModelInfo.model_validate(model_info)
     except ValueError as e:
         logger.error("Ошибка при переобучении модели")
         raise HTTPException(status_code=400, detail=str(e))
@@ -132,7 +250,7 @@ async def get_model(model_id: str):
     if not model_info:
         raise HTTPException(status_code=404, detail=f"Модель {model_id} не найдена")
     
-    return ModelInfo(**model_info)
+    return ModelInfo.model_validate(model_info)
 
 
 @router.delete("/models/{model_id}")
@@ -151,8 +269,10 @@ async def delete_model(model_id: str):
 async def get_datasets():
     """Получить список всех датасетов."""
     logger.info("Запрос списка датасетов")
-    datasets = dataset_service.get_all_datasets()
-    return [DatasetInfo(**dataset) for dataset in datasets]
+    datasets = get_dataset_service().get_all_datasets()
+    return Response(
+        _dataset_list_adapter.dump_json(_dataset_list_adapter.validate_python(datasets, from_attributes=True)), media_type="application/json"
+    )
 
 
 @router.post("/datasets/upload", response_model=DatasetInfo)
@@ -167,14 +287,13 @@ async def upload_dataset(
         raise HTTPException(status_code=400, detail="Поддерживаются только форматы csv и json")
 
     try:
-        content = await file.read()
-        dataset_id = dataset_service.upload_dataset(file.filename, content, format)
+        dataset_id = get_dataset_service().upload_dataset(file.filename, file.file, format)
 
-        dataset_info = dataset_service.get_dataset(dataset_id)
+        dataset_info = get_dataset_service().get_dataset(dataset_id)
         if not dataset_info:
             raise HTTPException(status_code=500, detail="Ошибка при загрузке датасета")
 
-        return DatasetInfo(**dataset_info)
+        return DatasetInfo.model_validate(dataset_info, from_attributes=True)
     except Exception as e:
         logger.error(f"Ошибка при загрузке датасета: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Внутренняя ошибка: {str(e)}")
@@ -185,11 +304,11 @@ async def get_dataset(dataset_id: str):
     """Получить информацию о датасете."""
     logger.info(f"Запрос информации о датасете {dataset_id}")
     
-    dataset_info = dataset_service.get_dataset(dataset_id)
+    dataset_info = get_dataset_service().get_dataset(dataset_id)
     if not dataset_info:
         raise HTTPException(status_code=404, detail=f"Датасет {dataset_id} не найден")
     
-    return DatasetInfo(**dataset_info)
+    return DatasetInfo.model_validate(dataset_info, from_attributes=True)
 
 
 @router.delete("/datasets/{dataset_id}")
@@ -197,7 +316,7 @@ async def delete_dataset(dataset_id: str):
     """Удалить датасет."""
     logger.info("Запрос на удаление датасета")
 
-    success = dataset_service.delete_dataset(dataset_id)
+    success = get_dataset_service().delete_dataset(dataset_id)
     if not success:
         raise HTTPException(status_code=404, detail=f"Датасет {dataset_id} не найден")
 
@@ -1,7 +1,9 @@
 """Конфигурация приложения."""
 
+import functools
 import os
 from pathlib import Path
+from typing import Dict
 
 try:
     from dotenv import load_dotenv
@@ -12,29 +14,51 @@ except ImportError:
     pass
 
 
+@functools.cache
+def get_env() -> Dict[str, str]:
+    """Снимок переменных окружения, снимается один раз на процесс (после загрузки .env)."""
+    return dict(os.environ)
+
+
 class Settings:
     """Настройки приложения."""
     
     def __init__(self):
-        self.api_host = os.getenv("API_HOST", "0.0.0.0")
-        self.api_port = int(os.getenv("API_PORT", "8000"))
-        self.grpc_port = int(os.getenv("GRPC_PORT", "50051"))
+        env = get_env()
+        self.api_host = env.get("API_HOST", "0.0.0.0")
+        self.api_port = int(env.get("API_PORT", "8000"))
+        self.api_workers = int(env.get("WEB_CONCURRENCY", "1"))
+        self.grpc_port = int(env.get("GRPC_PORT", "50051"))
+        self.grpc_max_workers = int(env.get("GRPC_MAX_WORKERS", "10"))
+        self.grpc_max_concurrent_streams = int(env.get("GRPC_MAX_CONCURRENT_STREAMS", "1000"))
+        self.grpc_predict_batch_window_ms = float(env.get("GRPC_PREDICT_BATCH_WINDOW_MS", "1"))
+        self.grpc_predict_max_batch_size = int(env.get("GRPC_PREDICT_MAX_BATCH_SIZE", "256"))
+        self.grpc_max_upload_size = int(env.get("GRPC_MAX_UPLOAD_SIZE", str(1024 ** 3)))
+        self.grpc_compression = env.get("GRPC_COMPRESSION", "gzip").lower()
+
+        self.minio_endpoint = env.get("MINIO_ENDPOINT", "localhost:9000")
+        self.minio_access_key = env.get("MINIO_ACCESS_KEY", "minioadmin")
+        self.minio_secret_key = env.get("MINIO_SECRET_KEY", "minioadmin")
+        self.minio_secure = env.get("MINIO_SECURE", "false").lower() in ("true", "1", "yes")
+        self.minio_pool_maxsize = int(
+            env.get("MINIO_POOL_MAXSIZE", str(max(32, (os.cpu_count() or 1) * 4)))
+        )
+        self.minio_backup_enabled = env.get("MINIO_BACKUP_ENABLED", "false").lower() in ("true", "1", "yes")
 
-        self.minio_endpoint = os.getenv("MINIO_ENDPOINT", "localhost:9000")
-        self.minio_access_key = os.getenv("MINIO_ACCESS_KEY", "minioadmin")
-        self.minio_secret_key = os.getenv("MINIO_SECRET_KEY", "minioadmin")
-        self.minio_secure = os.getenv("MINIO_SECURE", "false").lower() in ("true", "1", "yes")
+        self.clearml_api_host = env.get("CLEARML_API_HOST")
+        self.clearml_web_host = env.get("CLEARML_WEB_HOST")
+        self.clearml_api_access_key = env.get("CLEARML_API_ACCESS_KEY")
+        self.clearml_api_secret_key = env.get("CLEARML_API_SECRET_KEY")
 
-        self.clearml_api_host = os.getenv("CLEARML_API_HOST")
-        self.clearml_web_host = os.getenv("CLEARML_WEB_HOST")
-        self.clearml_api_access_key = os.getenv("CLEARML_API_ACCESS_KEY")
-        self.clearml_api_secret_key = os.getenv("CLEARML_API_SECRET_KEY")
+        self.dvc_remote = env.get("DVC_REMOTE", "minio")
+        self.dvc_cache_dir = env.get("DVC_CACHE_DIR", ".dvc/cache")
 
-        self.dvc_remote = os.getenv("DVC_REMOTE", "minio")
-        self.dvc_cache_dir = os.getenv("DVC_CACHE_DIR", ".dvc/cache")
+        self.models_dir = env.get("MODELS_DIR", "models")
+        self.model_cache_size = int(env.get("MODEL_CACHE_SIZE", "32"))
+        self.datasets_dir = env.get("DATASETS_DIR", "data")
 
-        self.models_dir = os.getenv("MODELS_DIR", "models")
-        self.datasets_dir = os.getenv("DATASETS_DIR", "data")
+        self.predict_cache_size = int(env.get("PREDICT_CACHE_SIZE", "10000"))
+        self.predict_cache_ttl = float(env.get("PREDICT_CACHE_TTL", "300"))
 
 
 settings = Settings()
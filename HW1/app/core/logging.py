@@ -1,18 +1,75 @@
 """Настройка логирования для приложения."""
 
+import atexit
+import copy
 import logging
+import logging.handlers
+import queue
 import sys
-from pythonjsonlogger import jsonlogger
+import orjson
+
+_RESERVED_ATTRS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """JSON-форматтер логов на основе orjson."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Сериализовать запись лога в JSON-строку."""
+        log_record = {
+            "asctime": self.formatTime(record),
+            "name": record.name,
+            "levelname": record.levelname,
+            "message": record.getMessage(),
+            "pathname": record.pathname,
+            "lineno": record.lineno,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS:
+                log_record[key] = value
+        if record.exc_info:
+            log_record["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_record["exc_info"] = record.exc_text
+        return orjson.dumps(log_record, default=str).decode()
+
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+    """
+    Обработчик, передающий записи в очередь без форматирования.
+
+    Стандартный QueueHandler форматирует запись в потоке вызывающего кода;
+    здесь в запись подставляется только текст сообщения и трассировка
+    исключения, а JSON собирает форматтер в потоке QueueListener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Подготовить копию записи для передачи в другой поток."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
 
 log_handler = logging.StreamHandler(sys.stdout)
-formatter = jsonlogger.JsonFormatter(
-    '%(asctime)s %(name)s %(levelname)s %(message)s %(pathname)s %(lineno)d'
-)
+formatter = JsonFormatter()
 log_handler.setFormatter(formatter)
 
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+queue_handler = LogQueueHandler(log_queue)
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
 logger = logging.getLogger("ml-service")
 logger.setLevel(logging.INFO)
-logger.addHandler(log_handler)
+logger.addHandler(queue_handler)
+logger.propagate = False
 
 logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
 logging.getLogger("clearml").setLevel(logging.WARNING)
@@ -0,0 +1,70 @@
+"""Кэш результатов предсказаний."""
+
+import hashlib
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+import orjson
+from cachetools import TTLCache
+
+from app.core.config import settings
+
+CacheKey = Tuple[str, bytes]
+
+
+class PredictCache:
+    """Потокобезопасный TTL-кэш предсказаний, ключ - (model_id, хэш признаков)."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Инициализация кэша.
+
+        Args:
+            maxsize: Максимальное количество записей
+            ttl: Время жизни записи в секундах
+        """
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._keys_by_model: Dict[str, Set[CacheKey]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _features_digest(features: Any) -> bytes:
+        """Посчитать хэш признаков (список списков, список словарей или ndarray)."""
+        if len(features) and isinstance(features[0], dict):
+            data = orjson.dumps(features, option=orjson.OPT_SORT_KEYS)
+        else:
+            arr = np.ascontiguousarray(features, dtype=np.float64)
+            data = repr(arr.shape).encode() + arr.tobytes()
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def make_key(self, model_id: str, features: Any) -> CacheKey:
+        """Построить ключ кэша."""
+        return model_id, self._features_digest(features)
+
+    def get(self, key: Hashable) -> Optional[List[float]]:
+        """Получить предсказания из кэша или None."""
+        with self._lock:
+            return self._cache.get(key)
+
+    def set(self, key: CacheKey, predictions: List[float]):
+        """Сохранить предсказания в кэш."""
+        with self._lock:
+            self._cache[key] = predictions
+            keys = self._keys_by_model[key[0]]
+            keys.add(key)
+            if len(keys) > self._cache.maxsize:
+                keys.intersection_update(self._cache.keys())
+
+    def invalidate(self, model_id: str):
+        """Удалить все записи для модели."""
+        with self._lock:
+            for key in self._keys_by_model.pop(model_id, ()):
+                self._cache.pop(key, None)
+
+
+predict_cache = PredictCache(
+    maxsize=settings.predict_cache_size,
+    ttl=settings.predict_cache_ttl,
+)
@@ -2,7 +2,10 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from app.api.rest import routes
+from app.core.config import settings
 from app.core.logging import logger
 from app.services.minio_service import minio_service
 
@@ -10,6 +13,7 @@ app = FastAPI(
     title="ML Service API",
     description="ML Service with REST and gRPC APIs",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -19,6 +23,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 app.include_router(routes.router)
 
@@ -30,3 +35,17 @@ async def root():
     """Корневой эндпоинт."""
     return {"message": "ML Service API", "docs": "/docs"}
 
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "app.main:app",
+        host=settings.api_host,
+        port=settings.api_port,
+        loop="uvloop",
+        http="httptools",
+        workers=settings.api_workers,
+        log_config=None,
+        access_log=False,
+    )
@@ -1,9 +1,15 @@
 """Pydantic схемы для API - только для валидации запросов/ответов."""
 
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Dict, List, Any, Optional
+import numpy as np
+from pydantic import BaseModel, Field, ConfigDict, WithJsonSchema, field_validator
+from typing import Annotated, Dict, List, Any, Optional, Union
 from datetime import datetime
 
+FeatureMatrix = Annotated[
+    np.ndarray,
+    WithJsonSchema({"type": "array", "items": {"type": "array", "items": {"type": "number"}}}),
+]
+
 
 class TrainRequest(BaseModel):
     """Запрос на обучение модели."""
@@ -17,12 +23,26 @@ class TrainRequest(BaseModel):
 
 class PredictRequest(BaseModel):
     """Запрос на получение предсказания."""
-    model_config = ConfigDict(extra="ignore", populate_by_name=False)
-    features: List[List[float]] | List[Dict[str, float]] = Field(
+    model_config = ConfigDict(extra="ignore", populate_by_name=False, arbitrary_types_allowed=True)
+    features: Union[FeatureMatrix, List[Dict[str, float]]] = Field(
         ..., 
         description="Массив признаков для предсказания"
     )
 
+    @field_validator("features", mode="before")
+    @classmethod
+    def _features_to_ndarray(cls, value: Any) -> Any:
+        """Преобразовать список списков в матрицу numpy одним вызовом."""
+        if isinstance(value, list) and value and isinstance(value[0], dict):
+            return value
+        try:
+            features = np.asarray(value, dtype=np.float64)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Некорректный массив признаков: {e}")
+        if features.ndim != 2:
+            raise ValueError("Признаки должны быть непустым двумерным массивом")
+        return features
+
 
 class PredictResponse(BaseModel):
     """Ответ с предсказанием."""
@@ -1,21 +1,66 @@
 """Сервис для работы с ClearML."""
 
+import contextlib
+import functools
 import os
+import threading
 from typing import Optional, Dict, Any
-from app.core.config import settings
+from app.core.config import get_env, settings
 from app.core.logging import logger
 
-try:
-    from clearml import Task, OutputModel
+Task = None
+OutputModel = None
+Project = None
+_clearml_import_lock = threading.Lock()
+_clearml_imported = False
+
+
+def _import_clearml():
+    """Импортировать ClearML при первом создании сервиса, а не при импорте модуля."""
+    global Task, OutputModel, Project, _clearml_imported
+    with _clearml_import_lock:
+        if _clearml_imported:
+            return
+        _clearml_imported = True
+        try:
+            from clearml import Task, OutputModel
+        except ImportError:
+            logger.warning("ClearML не установлен, функциональность будет ограничена")
+            return
+        # Project есть не во всех версиях ClearML; без него остается None.
+        with contextlib.suppress(ImportError):
+            from clearml import Project
+
+
+_IN_DOCKER = os.path.exists("/.dockerenv")
+
+
+def _set_env(env: Dict[str, str], key: str, value: str):
+    """Записать переменную в снимок окружения и в os.environ (его читает сам ClearML)."""
+    env[key] = value
+    os.environ[key] = value
+
+
+def _write_if_changed(path: str, content: str) -> bool:
+    """
+    Атомарно записать файл, если его содержимое отличается от текущего.
+
+    Returns:
+        True, если файл был перезаписан
+    """
     try:
-        from clearml import Project
-    except ImportError:
-        Project = None
-except ImportError:
-    logger.warning("ClearML не установлен, функциональность будет ограничена")
-    Task = None
-    OutputModel = None
-    Project = None
+        with open(path, "r") as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return True
 
 
 class ClearMLService:
@@ -24,31 +69,34 @@ class ClearMLService:
     def __init__(self):
         """Инициализация сервиса."""
         self.initialized = False
+        _import_clearml()
         if Task is not None:
             try:
-                api_host = os.getenv("CLEARML_API_HOST")
+                env = get_env()
+                
+                api_host = env.get("CLEARML_API_HOST")
                 if not api_host:
-                    api_host = "http://clearml-apiserver:8008" if os.path.exists("/.dockerenv") else "http://localhost:8008"
-                    os.environ["CLEARML_API_HOST"] = api_host
-                elif not api_host.startswith("http://") and not api_host.startswith("https://"):
+                    api_host = "http://clearml-apiserver:8008" if _IN_DOCKER else "http://localhost:8008"
+                    _set_env(env, "CLEARML_API_HOST", api_host)
+                elif not api_host.startswith(("http://", "https://")):
                     api_host = f"http://{api_host}"
-                    os.environ["CLEARML_API_HOST"] = api_host
+                    _set_env(env, "CLEARML_API_HOST", api_host)
                 
-                web_host = os.getenv("CLEARML_WEB_HOST")
+                web_host = env.get("CLEARML_WEB_HOST")
                 if not web_host:
                     web_host = "http://localhost:8080"
-                    os.environ["CLEARML_WEB_HOST"] = web_host
-                elif not web_host.startswith("http://") and not web_host.startswith("https://"):
+                    _set_env(env, "CLEARML_WEB_HOST", web_host)
+                elif not web_host.startswith(("http://", "https://")):
                     web_host = f"http://{web_host}"
-                    os.environ["CLEARML_WEB_HOST"] = web_host
+                    _set_env(env, "CLEARML_WEB_HOST", web_host)
                 
-                access_key = os.getenv("CLEARML_API_ACCESS_KEY") or settings.clearml_api_access_key
-                secret_key = os.getenv("CLEARML_API_SECRET_KEY") or settings.clearml_api_secret_key
+                access_key = env.get("CLEARML_API_ACCESS_KEY") or settings.clearml_api_access_key
+                secret_key = env.get("CLEARML_API_SECRET_KEY") or settings.clearml_api_secret_key
                 
                 if access_key:
-                    os.environ["CLEARML_API_ACCESS_KEY"] = access_key
+                    _set_env(env, "CLEARML_API_ACCESS_KEY", access_key)
                 if secret_key:
-                    os.environ["CLEARML_API_SECRET_KEY"] = secret_key
+                    _set_env(env, "CLEARML_API_SECRET_KEY", secret_key)
                 
                 if not access_key or not secret_key:
                     logger.warning("ClearML credentials не найдены. ClearML функциональность будет ограничена.")
@@ -57,34 +105,35 @@ class ClearMLService:
                 
                 clearml_conf_path = "/tmp/clearml.conf"
                 try:
-                    with open(clearml_conf_path, "w") as f:
-                        f.write(f"api {{\n")
-                        f.write(f"  api_server: {api_host}\n")
-                        f.write(f"  web_server: {web_host}\n")
-                        f.write(f"  files_server: {web_host.replace(':8080', ':8081')}\n")
-                        f.write(f"  credentials {{\n")
-                        f.write(f"    \"{api_host}\" {{\n")
-                        f.write(f"      access_key = \"{access_key}\"\n")
-                        f.write(f"      secret_key = \"{secret_key}\"\n")
-                        f.write(f"    }}\n")
-                        f.write(f"  }}\n")
-                        f.write(f"}}\n")
-                    os.environ["CLEARML_CONFIG_FILE"] = clearml_conf_path
-                    logger.info(f"Создан файл конфигурации ClearML: {clearml_conf_path}")
+                    conf = (
+                        f"api {{\n"
+                        f"  api_server: {api_host}\n"
+                        f"  web_server: {web_host}\n"
+                        f"  files_server: {web_host.replace(':8080', ':8081')}\n"
+                        f"  credentials {{\n"
+                        f"    \"{api_host}\" {{\n"
+                        f"      access_key = \"{access_key}\"\n"
+                        f"      secret_key = \"{secret_key}\"\n"
+                        f"    }}\n"
+                        f"  }}\n"
+                        f"}}\n"
+                    )
+                    if _write_if_changed(clearml_conf_path, conf):
+                        logger.info(f"Создан файл конфигурации ClearML: {clearml_conf_path}")
+                    _set_env(env, "CLEARML_CONFIG_FILE", clearml_conf_path)
                 except Exception as e:
                     logger.warning(f"Не удалось создать файл конфигурации ClearML: {e}")
                 
-                if not os.getenv("CLEARML_S3_HOST"):
-                    s3_host = "minio:9000" if os.path.exists("/.dockerenv") else "localhost:9000"
-                    os.environ["CLEARML_S3_HOST"] = s3_host
-                    os.environ["CLEARML_S3_ACCESS_KEY"] = settings.minio_access_key
-                    os.environ["CLEARML_S3_SECRET_KEY"] = settings.minio_secret_key
-                    os.environ["CLEARML_S3_BUCKET"] = "clearml-models"
-                    os.environ["CLEARML_S3_REGION"] = "us-east-1"
-                    os.environ["CLEARML_S3_USE_HTTPS"] = "false"
+                if not env.get("CLEARML_S3_HOST"):
+                    _set_env(env, "CLEARML_S3_HOST", "minio:9000" if _IN_DOCKER else "localhost:9000")
+                    _set_env(env, "CLEARML_S3_ACCESS_KEY", settings.minio_access_key)
+                    _set_env(env, "CLEARML_S3_SECRET_KEY", settings.minio_secret_key)
+                    _set_env(env, "CLEARML_S3_BUCKET", "clearml-models")
+                    _set_env(env, "CLEARML_S3_REGION", "us-east-1")
+                    _set_env(env, "CLEARML_S3_USE_HTTPS", "false")
                 
                 self.initialized = True
-                logger.info(f"ClearML инициализирован (API: {os.getenv('CLEARML_API_HOST')}, S3: {os.getenv('CLEARML_S3_HOST')})")
+                logger.info(f"ClearML инициализирован (API: {api_host}, S3: {env.get('CLEARML_S3_HOST')})")
             except Exception as e:
                 logger.warning(f"Не удалось инициализировать ClearML: {e}")
         else:
@@ -96,7 +145,7 @@ class ClearMLService:
         model_type: str,
         hyperparameters: Dict[str, Any],
         dataset_id: str,
-    ) -> Optional[Task]:
+    ) -> Optional[Any]:
         """
         Создать эксперимент в ClearML.
 
@@ -113,7 +162,7 @@ class ClearMLService:
             return None
 
         try:
-            project_name = os.getenv("CLEARML_PROJECT_NAME", "ml-service")
+            project_name = get_env().get("CLEARML_PROJECT_NAME", "ml-service")
             if Project is not None:
                 try:
                     project = Project.get_project_id(project_name)
@@ -159,9 +208,7 @@ class ClearMLService:
 
             return task
         except Exception as e:
-            logger.error(f"Ошибка при создании эксперимента в ClearML (model_id: {model_id}): {str(e)}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.exception(f"Ошибка при создании эксперимента в ClearML (model_id: {model_id}): {str(e)}")
             return None
 
     def save_model(
@@ -205,13 +252,12 @@ class ClearMLService:
             
             if metrics:
                 for metric_name, metric_value in metrics.items():
-                    if metric_value is not None and not (isinstance(metric_value, float) and (metric_value != metric_value or metric_value == float('inf'))):
-                        task.logger.report_scalar(
-                            title="Final Metrics",
-                            series=metric_name,
-                            value=float(metric_value),
-                            iteration=2
-                        )
+                    task.logger.report_scalar(
+                        title="Final Metrics",
+                        series=metric_name,
+                        value=float(metric_value),
+                        iteration=2
+                    )
 
             if not os.path.exists(model_path):
                 logger.error(f"Файл модели не найден: {model_path}")
@@ -250,9 +296,7 @@ class ClearMLService:
 
             return output_model.id
         except Exception as e:
-            logger.error(f"Ошибка при сохранении модели в ClearML (model_id: {model_id}): {str(e)}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.exception(f"Ошибка при сохранении модели в ClearML (model_id: {model_id}): {str(e)}")
             return None
 
     def load_model(self, clearml_model_id: Optional[str], model_id: str) -> Optional[str]:
@@ -281,5 +325,9 @@ class ClearMLService:
             logger.error(f"Ошибка при загрузке модели из ClearML (model_id: {model_id}): {str(e)}")
             return None
 
-clearml_service = ClearMLService()
+
+@functools.cache
+def get_clearml_service() -> ClearMLService:
+    """Получить сервис ClearML, создается при первом обращении."""
+    return ClearMLService()
 
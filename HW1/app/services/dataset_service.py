@@ -1,62 +1,133 @@
 """Сервис управления датасетами."""
 
+import atexit
+import functools
+import io
 import os
+import threading
 import uuid
-import json
+from concurrent import futures
+import numpy as np
+import orjson
 import pandas as pd
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Optional, List, Tuple
+from typing import BinaryIO, Dict, Optional, List, Tuple
 from app.core.config import settings
 from app.core.logging import logger
-from app.services.dvc_service import DVCService
+from app.services.dvc_service import DVCService, get_dvc_service
 from app.services.minio_service import minio_service
 
+_COPY_CHUNK_SIZE = 1024 * 1024
+_METADATA_FLUSH_INTERVAL = 5.0
+
+
+def _copy_to_file(file_obj: BinaryIO, dst: BinaryIO) -> int:
+    """
+    Скопировать файловый объект в открытый файл и вернуть число записанных байт.
+
+    Источник с файловым дескриптором (файл на диске, SpooledTemporaryFile)
+    копируется ядром через os.sendfile, остальные - частями через буфер.
+    SpooledTemporaryFile, еще хранящийся в памяти, при вызове fileno()
+    сбрасывается на диск (не больше max_size байт).
+    """
+    try:
+        src_fd = file_obj.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        src_fd = None
+    if src_fd is not None:
+        start = offset = file_obj.tell()
+        dst_fd = dst.fileno()
+        while sent := os.sendfile(dst_fd, src_fd, offset, _COPY_CHUNK_SIZE):
+            offset += sent
+        file_obj.seek(offset)
+        return offset - start
+
+    written = 0
+    while chunk := file_obj.read(_COPY_CHUNK_SIZE):
+        dst.write(chunk)
+        written += len(chunk)
+    return written
+
+
+@dataclass(slots=True)
+class DatasetRecord:
+    """Запись реестра датасетов."""
+    dataset_id: str
+    file_name: str
+    filepath: str
+    format: str
+    size: int
+    created_at: datetime
+    dvc_version: Optional[str] = None
+
 
 class DatasetService:
     """Сервис для управления датасетами."""
 
     def __init__(self):
         """Инициализация сервиса."""
-        self.datasets: Dict[str, Dict] = {}
+        self.datasets: Dict[str, DatasetRecord] = {}
         self.datasets_dir = settings.datasets_dir
         os.makedirs(self.datasets_dir, exist_ok=True)
         self.metadata_file = os.path.join(self.datasets_dir, "datasets_metadata.json")
-        self.dvc_service = DVCService()
+        self._metadata_lock = threading.Lock()
+        self._metadata_dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        atexit.register(self._flush_metadata)
+        self._push_executor = futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="dvc-push")
         self._load_metadata_from_file()
         self._load_datasets_from_minio()
         logger.info("Инициализирован DatasetService")
+
+    @property
+    def dvc_service(self) -> DVCService:
+        """Сервис DVC, инициализируется при первом обращении."""
+        return get_dvc_service()
     
     def _load_metadata_from_file(self):
         """Загрузить метаданные датасетов из файла."""
         if os.path.exists(self.metadata_file):
             try:
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.metadata_file, 'rb') as f:
+                    data = orjson.loads(f.read())
                     for dataset_id, dataset_info in data.items():
                         if isinstance(dataset_info.get('created_at'), str):
                             try:
                                 dataset_info['created_at'] = datetime.fromisoformat(dataset_info['created_at'])
-                            except:
+                            except ValueError:
                                 dataset_info['created_at'] = datetime.now()
-                        self.datasets[dataset_id] = dataset_info
+                        self.datasets[dataset_id] = DatasetRecord(**dataset_info)
                     logger.info(f"Загружено {len(self.datasets)} датасетов из метаданных")
             except Exception as e:
                 logger.warning(f"Не удалось загрузить метаданные датасетов: {e}")
     
     def _save_metadata_to_file(self):
-        """Сохранить метаданные датасетов в файл."""
-        try:
-            data = {}
-            for dataset_id, dataset_info in self.datasets.items():
-                info_copy = dataset_info.copy()
-                if isinstance(info_copy.get('created_at'), datetime):
-                    info_copy['created_at'] = info_copy['created_at'].isoformat()
-                data[dataset_id] = info_copy
-            
-            with open(self.metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
-        except Exception as e:
-            logger.warning(f"Не удалось сохранить метаданные датасетов: {e}")
+        """Пометить метаданные измененными и запланировать отложенную запись в файл."""
+        with self._metadata_lock:
+            self._metadata_dirty = True
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(_METADATA_FLUSH_INTERVAL, self._flush_metadata)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def _flush_metadata(self):
+        """Записать метаданные датасетов в файл, если они изменились."""
+        with self._metadata_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._metadata_dirty:
+                return
+            try:
+                content = orjson.dumps(self.datasets, option=orjson.OPT_INDENT_2, default=str)
+                tmp_path = f"{self.metadata_file}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp_path, self.metadata_file)
+                self._metadata_dirty = False
+            except Exception as e:
+                logger.warning(f"Не удалось сохранить метаданные датасетов: {e}")
     
     def _load_datasets_from_minio(self):
         """Загрузить список датасетов из DVC."""
@@ -64,14 +135,14 @@ class DatasetService:
     
 
     def upload_dataset(
-        self, file_name: str, file_content: bytes, format: str = "csv"
+        self, file_name: str, file_obj: BinaryIO, format: str = "csv"
     ) -> str:
         """
         Загрузить датасет и сохранить в DVC.
 
         Args:
             file_name: Имя файла
-            file_content: Содержимое файла
+            file_obj: Файловый объект с содержимым (копируется на диск частями)
             format: Формат файла (csv или json)
 
         Returns:
@@ -81,21 +152,20 @@ class DatasetService:
         filepath = os.path.join(self.datasets_dir, f"{dataset_id}.{format}")
 
         with open(filepath, "wb") as f:
-            f.write(file_content)
+            file_size = _copy_to_file(file_obj, f)
 
-        file_size = os.path.getsize(filepath)
         dvc_version = self.dvc_service.add_dataset(filepath, file_name)
-        self.dvc_service.push_dataset(filepath)
-
-        self.datasets[dataset_id] = {
-            "dataset_id": dataset_id,
-            "file_name": file_name,
-            "filepath": filepath,
-            "format": format,
-            "size": file_size,
-            "created_at": datetime.now(),
-            "dvc_version": dvc_version,
-        }
+        self._push_executor.submit(self.dvc_service.push_dataset, filepath)
+
+        self.datasets[dataset_id] = DatasetRecord(
+            dataset_id=dataset_id,
+            file_name=file_name,
+            filepath=filepath,
+            format=format,
+            size=file_size,
+            created_at=datetime.now(),
+            dvc_version=dvc_version,
+        )
         
         self._save_metadata_to_file()
 
@@ -106,7 +176,7 @@ class DatasetService:
         return dataset_id
     
 
-    def get_dataset(self, dataset_id: str) -> Optional[Dict]:
+    def get_dataset(self, dataset_id: str) -> Optional[DatasetRecord]:
         """
         Получить информацию о датасете.
 
@@ -114,20 +184,20 @@ class DatasetService:
             dataset_id: ID датасета
 
         Returns:
-            Словарь с информацией о датасете или None
+            Запись о датасете или None
         """
         return self.datasets.get(dataset_id)
 
-    def get_all_datasets(self) -> List[Dict]:
+    def get_all_datasets(self) -> List[DatasetRecord]:
         """
         Получить список всех датасетов.
 
         Returns:
-            Список словарей с информацией о датасетах
+            Список записей о датасетах
         """
         return list(self.datasets.values())
 
-    def load_dataset(self, dataset_id: str) -> Tuple[List[List[float]], List[float]]:
+    def load_dataset(self, dataset_id: str) -> Tuple[np.ndarray, np.ndarray]:
         """
         Загрузить датасет и вернуть признаки и целевую переменную.
         Если файла нет локально - загружает из DVC.
@@ -136,7 +206,7 @@ class DatasetService:
             dataset_id: ID датасета
 
         Returns:
-            Кортеж (X, y) где X - признаки, y - целевая переменная
+            Кортеж (X, y) где X - матрица признаков float64, y - целевая переменная
 
         Raises:
             ValueError: Если датасет не найден
@@ -145,9 +215,8 @@ class DatasetService:
         if not dataset_info:
             raise ValueError(f"Датасет {dataset_id} не найден")
 
-        filepath = dataset_info["filepath"]
-        format = dataset_info["format"]
-        file_name = dataset_info["file_name"]
+        filepath = dataset_info.filepath
+        format = dataset_info.format
 
         if not os.path.exists(filepath):
             logger.info(f"Файл {filepath} не найден локально, загружаем из DVC")
@@ -155,7 +224,9 @@ class DatasetService:
                 raise ValueError(f"Не удалось загрузить датасет {dataset_id} из DVC")
 
         if format == "csv":
-            df = pd.read_csv(filepath)
+            if len(pd.read_csv(filepath, nrows=0).columns) < 2:
+                raise ValueError("Датасет должен содержать минимум 2 столбца")
+            df = pd.read_csv(filepath, engine="pyarrow")
         elif format == "json":
             df = pd.read_json(filepath)
         else:
@@ -164,11 +235,14 @@ class DatasetService:
         if len(df.columns) < 2:
             raise ValueError("Датасет должен содержать минимум 2 столбца")
 
-        X = df.iloc[:, :-1].values.tolist()
-        y = df.iloc[:, -1].values.tolist()
+        try:
+            X = df.iloc[:, :-1].to_numpy(dtype=np.float64)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Признаки датасета должны быть числовыми: {e}")
+        y = df.iloc[:, -1].to_numpy()
 
         logger.info(
-            f"Датасет загружен (ID: {dataset_id}): {len(X)} samples, {len(X[0]) if X else 0} features"
+            f"Датасет загружен (ID: {dataset_id}): {X.shape[0]} samples, {X.shape[1]} features"
         )
 
         return X, y
@@ -187,8 +261,7 @@ class DatasetService:
             return False
 
         dataset_info = self.datasets[dataset_id]
-        filepath = dataset_info["filepath"]
-        file_name = dataset_info["file_name"]
+        filepath = dataset_info.filepath
 
         if os.path.exists(filepath):
             os.remove(filepath)
@@ -205,5 +278,9 @@ class DatasetService:
         return True
     
 
-dataset_service = DatasetService()
+
+@functools.cache
+def get_dataset_service() -> DatasetService:
+    """Получить сервис датасетов, создается при первом обращении."""
+    return DatasetService()
 
@@ -1,11 +1,31 @@
 """Сервис для работы с DVC."""
 
+import configparser
+import functools
 import os
+import re
 import subprocess
+import threading
 from typing import Optional
 from app.core.config import settings
 from app.core.logging import logger
 
+try:
+    from dvc.repo import Repo
+except ImportError:
+    logger.warning("DVC Python API недоступен, будут использоваться вызовы CLI")
+    Repo = None
+
+_DVC_CONFIG_PATH = os.path.join(".dvc", "config")
+_DVC_MD5_RE = re.compile(rb"^\s*-\s*md5:\s*([0-9a-f]+)", re.MULTILINE)
+_DVC_GITIGNORE_RULES = ("data/*.csv", "!data/*.csv.dvc")
+
+
+def _is_data_ignore_rule(line: str) -> bool:
+    """Правило .gitignore, целиком скрывающее data/ (его заменяют правила для DVC)."""
+    stripped = line.strip()
+    return stripped.startswith("data/") and "*.csv" not in stripped
+
 
 class DVCService:
     """Сервис для версионирования датасетов через DVC."""
@@ -15,7 +35,19 @@ class DVCService:
         self.remote = settings.dvc_remote
         self._init_dvc()
         self._setup_dvc_remote()
+        self._repo = self._open_repo()
+        self._repo_lock = threading.Lock()
         logger.info("Инициализирован DVCService")
+
+    def _open_repo(self):
+        """Открыть репозиторий DVC в процессе (один раз на время жизни сервиса)."""
+        if Repo is None:
+            return None
+        try:
+            return Repo(".")
+        except Exception as e:
+            logger.warning(f"Не удалось открыть DVC репозиторий, будут использоваться вызовы CLI: {e}")
+            return None
     
     def _init_dvc(self):
         """Инициализировать DVC если еще не инициализирован."""
@@ -30,72 +62,61 @@ class DVCService:
                 gitignore_path = ".gitignore"
                 if os.path.exists(gitignore_path):
                     with open(gitignore_path, "r") as f:
-                        lines = f.readlines()
-                    modified = False
-                    new_lines = []
-                    for i, line in enumerate(lines):
-                        stripped = line.strip()
-                        if stripped == "data/":
-                            new_lines.append("data/*.csv\n")
-                            new_lines.append("!data/*.csv.dvc\n")
-                            modified = True
-                        elif stripped.startswith("data/") and "*.csv" not in stripped:
-                            new_lines.append("data/*.csv\n")
-                            new_lines.append("!data/*.csv.dvc\n")
-                            modified = True
-                        else:
-                            new_lines.append(line)
-                    if modified:
-                        with open(gitignore_path, "w") as f:
-                            f.writelines(new_lines)
-                        logger.info("Обновлен .gitignore для поддержки DVC")
+                        lines = f.read().split("\n")
+                    existing = {line.strip() for line in lines}
+                    if not existing.issuperset(_DVC_GITIGNORE_RULES):
+                        new_lines = []
+                        modified = False
+                        for line in lines:
+                            if _is_data_ignore_rule(line):
+                                if not modified:
+                                    new_lines.extend(_DVC_GITIGNORE_RULES)
+                                    modified = True
+                            else:
+                                new_lines.append(line)
+                        if modified:
+                            with open(gitignore_path, "w") as f:
+                                f.write("\n".join(new_lines))
+                            logger.info("Обновлен .gitignore для поддержки DVC")
                 logger.info("DVC инициализирован")
         except Exception as e:
             logger.warning(f"Не удалось инициализировать DVC: {e}")
     
     def _setup_dvc_remote(self):
-        """Настроить DVC remote для MinIO."""
+        """Настроить DVC remote для MinIO правкой .dvc/config, без запуска dvc."""
         try:
-            result = subprocess.run(
-                ["dvc", "remote", "list"],
-                capture_output=True,
-                text=True,
-            )
             endpoint = settings.minio_endpoint
             endpoint = endpoint.replace('http://', '').replace('https://', '')
             
-            if self.remote not in result.stdout:
-                subprocess.run(
-                    ["dvc", "remote", "add", self.remote, f"s3://dvc-storage"],
-                    capture_output=True,
-                    text=True,
-                    check=False,
-                )
-                subprocess.run(
-                    ["dvc", "remote", "default", self.remote],
-                    capture_output=True,
-                    text=True,
-                    check=False,
-                )
+            config = configparser.ConfigParser(interpolation=None)
+            config.optionxform = str
+            config.read(_DVC_CONFIG_PATH)
             
-            subprocess.run(
-                ["dvc", "remote", "modify", self.remote, "endpointurl", f"http://{endpoint}"],
-                capture_output=True,
-                text=True,
-                check=False,
-            )
-            subprocess.run(
-                ["dvc", "remote", "modify", self.remote, "access_key_id", settings.minio_access_key],
-                capture_output=True,
-                text=True,
-                check=False,
-            )
-            subprocess.run(
-                ["dvc", "remote", "modify", self.remote, "secret_access_key", settings.minio_secret_key],
-                capture_output=True,
-                text=True,
-                check=False,
-            )
+            section = f"'remote \"{self.remote}\"'"
+            changed = False
+            if not config.has_section(section):
+                config.add_section(section)
+                config.set(section, "url", "s3://dvc-storage")
+                if not config.has_section("core"):
+                    config.add_section("core")
+                config.set("core", "remote", self.remote)
+                changed = True
+            
+            remote_options = {
+                "endpointurl": f"http://{endpoint}",
+                "access_key_id": settings.minio_access_key,
+                "secret_access_key": settings.minio_secret_key,
+            }
+            for key, value in remote_options.items():
+                if config.get(section, key, fallback=None) != value:
+                    config.set(section, key, value)
+                    changed = True
+            
+            if changed:
+                tmp_path = f"{_DVC_CONFIG_PATH}.tmp"
+                with open(tmp_path, "w") as f:
+                    config.write(f)
+                os.replace(tmp_path, _DVC_CONFIG_PATH)
             logger.info(f"DVC remote '{self.remote}' настроен для MinIO (endpoint: {endpoint})")
         except Exception as e:
             logger.warning(f"Не удалось настроить DVC remote: {e}")
@@ -112,12 +133,16 @@ class DVCService:
             Версия датасета в DVC или None
         """
         try:
-            result = subprocess.run(
-                ["dvc", "add", filepath],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
+            if self._repo is None:
+                subprocess.run(
+                    ["dvc", "add", filepath],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+            else:
+                with self._repo_lock:
+                    self._repo.add(filepath)
 
             try:
                 subprocess.run(
@@ -133,18 +158,22 @@ class DVCService:
             try:
                 dvc_file = f"{filepath}.dvc"
                 if os.path.exists(dvc_file):
+                    with open(dvc_file, "rb") as f:
+                        data = f.read()
+                    match = _DVC_MD5_RE.search(data)
+                    if match:
+                        return match.group(1)[:16].decode()
                     import yaml
-                    with open(dvc_file, "r") as f:
-                        dvc_data = yaml.safe_load(f)
-                        if dvc_data and "outs" in dvc_data and len(dvc_data["outs"]) > 0:
-                            md5_hash = dvc_data["outs"][0].get("md5", "")
-                            if md5_hash:
-                                return md5_hash[:16]
+                    dvc_data = yaml.safe_load(data)
+                    if dvc_data and "outs" in dvc_data and len(dvc_data["outs"]) > 0:
+                        md5_hash = dvc_data["outs"][0].get("md5", "")
+                        if md5_hash:
+                            return md5_hash[:16]
             except Exception:
                 pass
             return None
 
-        except subprocess.CalledProcessError as e:
+        except Exception as e:
             logger.error(f"Ошибка при добавлении датасета в DVC: {str(e)} (filepath: {filepath})")
             return None
 
@@ -159,15 +188,19 @@ class DVCService:
             True если успешно, False иначе
         """
         try:
-            result = subprocess.run(
-                ["dvc", "push", "-r", self.remote, filepath],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
+            if self._repo is None:
+                result = subprocess.run(
+                    ["dvc", "push", "-r", self.remote, filepath],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                if result.stdout:
+                    logger.debug(f"DVC push stdout: {result.stdout}")
+            else:
+                with self._repo_lock:
+                    self._repo.push(targets=[filepath], remote=self.remote)
             logger.info(f"Датасет отправлен в S3 (MinIO) через DVC: {filepath}")
-            if result.stdout:
-                logger.debug(f"DVC push stdout: {result.stdout}")
             return True
         except subprocess.CalledProcessError as e:
             error_msg = f"Ошибка при отправке датасета в S3 (filepath: {filepath})"
@@ -192,15 +225,19 @@ class DVCService:
             True если успешно, False иначе
         """
         try:
-            subprocess.run(
-                ["dvc", "pull", "-r", self.remote, filepath],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
+            if self._repo is None:
+                subprocess.run(
+                    ["dvc", "pull", "-r", self.remote, filepath],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+            else:
+                with self._repo_lock:
+                    self._repo.pull(targets=[filepath], remote=self.remote)
             logger.info("Датасет загружен из удаленного хранилища")
             return True
-        except subprocess.CalledProcessError as e:
+        except Exception as e:
             logger.error(
                 f"Ошибка при загрузке датасета {filepath}: {str(e)}"
             )
@@ -214,20 +251,25 @@ class DVCService:
             Список путей к датасетам
         """
         try:
-            result = subprocess.run(
-                ["dvc", "list", "."],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            datasets = []
-            for line in result.stdout.split("\n"):
-                if line.strip().endswith(".dvc"):
-                    datasets.append(line.strip())
-            return datasets
-        except subprocess.CalledProcessError as e:
+            if self._repo is None:
+                result = subprocess.run(
+                    ["dvc", "list", "."],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                paths = (line.strip() for line in result.stdout.split("\n"))
+            else:
+                with self._repo_lock:
+                    paths = [entry["path"] for entry in Repo.ls(".")]
+            return [path for path in paths if path.endswith(".dvc")]
+        except Exception as e:
             logger.error("Ошибка при получении списка датасетов")
             return []
 
-dvc_service = DVCService()
+
+@functools.cache
+def get_dvc_service() -> DVCService:
+    """Получить сервис DVC, создается при первом обращении."""
+    return DVCService()
 
@@ -1,10 +1,32 @@
 """Сервис для работы с MinIO."""
 
+import os
+import socket
+import certifi
+import urllib3
+from urllib3.connection import HTTPConnection
+from urllib3.util import Retry, Timeout
 from minio import Minio
 from minio.error import S3Error
 from app.core.config import settings
 from app.core.logging import logger
 
+_HTTP_TIMEOUT = 300
+
+
+def _create_http_client() -> urllib3.PoolManager:
+    """Создать общий пул HTTP-соединений для клиента MinIO."""
+    return urllib3.PoolManager(
+        num_pools=1,
+        maxsize=settings.minio_pool_maxsize,
+        block=False,
+        timeout=Timeout(connect=_HTTP_TIMEOUT, read=_HTTP_TIMEOUT),
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+        socket_options=HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)],
+    )
+
 
 class MinIOService:
     """Сервис для работы с MinIO."""
@@ -22,6 +44,7 @@ class MinIOService:
                 access_key=settings.minio_access_key,
                 secret_key=settings.minio_secret_key,
                 secure=settings.minio_secure,
+                http_client=_create_http_client(),
             )
             logger.info("MinIO инициализирован")
         except Exception as e:
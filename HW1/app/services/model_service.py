@@ -1,16 +1,38 @@
 """Сервис управления моделями."""
 
+import atexit
 import os
+import tarfile
+import tempfile
 import uuid
-import json
+import threading
+from collections import OrderedDict, deque
+from concurrent import futures
 from datetime import datetime
-from typing import Dict, Optional, List, Union
+from math import isfinite
+from numbers import Real
+from typing import Deque, Dict, Optional, List, Tuple, Union
+import numpy as np
+import orjson
 from app.models import LinearModel, RandomForestModel, BaseMLModel
 from app.core.config import settings
 from app.core.logging import logger
-from app.services.clearml_service import ClearMLService
+from app.core.predict_cache import predict_cache
+from app.services.clearml_service import ClearMLService, get_clearml_service
 from app.services.minio_service import minio_service
 
+_METADATA_FLUSH_INTERVAL = 5.0
+_METADATA_FLUSH_THRESHOLD = 32
+_MINIO_PART_SIZE = 16 * 1024 * 1024
+_MINIO_MODELS_BUCKET = "clearml-models"
+_UPLOAD_BATCH_INTERVAL = 5.0
+_UPLOAD_BATCH_SIZE = 32
+_UPLOAD_SPOOL_SIZE = 64 * 1024 * 1024
+# Snowball auto-extract работает только для архивов, загруженных одним PUT,
+# а клиент MinIO читает тело такого запроса в память целиком
+_SNOWBALL_MAX_SIZE = 256 * 1024 * 1024
+_PREFETCH_WORKERS = 32
+
 
 class ModelService:
     """Сервис для управления ML моделями."""
@@ -18,71 +40,153 @@ class ModelService:
     def __init__(self):
         """Инициализация сервиса."""
         self.models: Dict[str, Dict] = {}
+        self._all_models_cache: Optional[List[Dict]] = None
         self.models_dir = settings.models_dir
         os.makedirs(self.models_dir, exist_ok=True)
         self.metadata_file = os.path.join(self.models_dir, "models_metadata.json")
-        self.clearml_service = ClearMLService()
+        self.metadata_log = os.path.join(self.models_dir, "models_metadata.jsonl")
+        self._metadata_lock = threading.Lock()
+        self._metadata_log_lines = 0
+        self._metadata_dirty: set = set()
+        self._flush_timer: Optional[threading.Timer] = None
+        atexit.register(self._flush_metadata)
+        self._upload_executor = futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="minio-upload")
+        self._upload_futures: Dict[str, futures.Future] = {}
+        self._pending_uploads: Deque[Tuple[str, str]] = deque()
+        self._upload_lock = threading.Lock()
+        self._upload_timer: Optional[threading.Timer] = None
+        atexit.register(self.flush_pending_uploads)
+        self._loaded_models: "OrderedDict[str, BaseMLModel]" = OrderedDict()
+        self._loaded_models_lock = threading.Lock()
         self._load_models_from_disk()
         logger.info("Инициализирован ModelService")
+
+    @property
+    def clearml_service(self) -> ClearMLService:
+        """Сервис ClearML, инициализируется при первом обращении."""
+        return get_clearml_service()
     
     def _load_models_from_disk(self):
         """Загрузить метаданные моделей из файловой системы."""
+        data = {}
         if os.path.exists(self.metadata_file):
             try:
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for model_id, model_info in data.items():
-                        if isinstance(model_info.get('created_at'), str):
-                            try:
-                                model_info['created_at'] = datetime.fromisoformat(model_info['created_at'])
-                            except:
-                                model_info['created_at'] = datetime.now()
-                        self.models[model_id] = model_info
-                    logger.info(f"Загружено {len(self.models)} моделей из метаданных")
+                with open(self.metadata_file, 'rb') as f:
+                    data = orjson.loads(f.read())
             except Exception as e:
                 logger.warning(f"Не удалось загрузить метаданные моделей: {e}")
-        
+
+        if os.path.exists(self.metadata_log):
+            try:
+                with open(self.metadata_log, 'rb') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        self._metadata_log_lines += 1
+                        try:
+                            entry = orjson.loads(line)
+                        except orjson.JSONDecodeError:
+                            logger.warning("Пропущена поврежденная запись журнала метаданных моделей")
+                            continue
+                        if entry.get('deleted'):
+                            data.pop(entry['model_id'], None)
+                        else:
+                            data[entry['model_id']] = entry
+            except Exception as e:
+                logger.warning(f"Не удалось загрузить журнал метаданных моделей: {e}")
+
+        now = datetime.now()
+        for model_info in data.values():
+            created_at = model_info.get('created_at')
+            if isinstance(created_at, str):
+                try:
+                    model_info['created_at'] = datetime.fromisoformat(created_at)
+                except ValueError:
+                    model_info['created_at'] = now
+        self.models.update(data)
+        if data:
+            logger.info(f"Загружено {len(self.models)} моделей из метаданных")
+
+        if os.path.exists(self.metadata_file):
+            try:
+                self._compact_metadata()
+                os.remove(self.metadata_file)
+                logger.info("Метаданные моделей перенесены в журнал")
+            except Exception as e:
+                logger.warning(f"Не удалось перенести метаданные моделей в журнал: {e}")
+
         if os.path.exists(self.models_dir):
-            for file_name in os.listdir(self.models_dir):
-                if file_name.endswith('.pkl') and file_name != '.gitkeep':
-                    model_id = file_name[:-4]
+            with os.scandir(self.models_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.pkl') or not entry.is_file():
+                        continue
+                    model_id = entry.name[:-4]
                     if model_id not in self.models:
-                        model_path = os.path.join(self.models_dir, file_name)
                         self.models[model_id] = {
                             "model_id": model_id,
                             "model_type": "linear",
                             "dataset_id": "unknown",
                             "hyperparameters": {},
-                            "created_at": datetime.fromtimestamp(os.path.getmtime(model_path)),
+                            "created_at": datetime.fromtimestamp(entry.stat().st_mtime),
                             "status": "trained",
-                            "model_path": model_path,
+                            "model_path": entry.path,
                             "clearml_model_id": None,
                             "metrics": None,
                         }
                         logger.info(f"Найдена модель без метаданных: {model_id}")
     
-    def _save_model_metadata(self, model_id: Optional[str] = None):
-        """Сохранить метаданные моделей в файл."""
-        try:
-            data = {}
-            for mid, info in self.models.items():
-                if model_id is None or mid == model_id:
-                    info_copy = info.copy()
-                    if isinstance(info_copy.get('created_at'), datetime):
-                        info_copy['created_at'] = info_copy['created_at'].isoformat()
-                    data[mid] = info_copy
-            
-            all_data = {}
-            if os.path.exists(self.metadata_file):
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    all_data = json.load(f)
-            
-            all_data.update(data)
-            
-            with open(self.metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(all_data, f, indent=2, ensure_ascii=False, default=str)
-        except Exception as e:
-            logger.warning(f"Не удалось сохранить метаданные модели: {e}")
+    @staticmethod
+    def _metadata_line(entry: Dict) -> bytes:
+        """Сериализовать запись журнала метаданных в одну строку JSON."""
+        return orjson.dumps(
+            entry, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY, default=str
+        )
+
+    def _save_model_metadata(self, model_id: str):
+        """Пометить метаданные модели измененными и запланировать запись в журнал."""
+        with self._metadata_lock:
+            self._metadata_dirty.add(model_id)
+            flush_now = len(self._metadata_dirty) >= _METADATA_FLUSH_THRESHOLD
+            if not flush_now and self._flush_timer is None:
+                self._flush_timer = threading.Timer(_METADATA_FLUSH_INTERVAL, self._flush_metadata)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        if flush_now:
+            self._flush_metadata()
+
+    def _flush_metadata(self):
+        """Дописать измененные метаданные моделей в журнал и сжать его при разрастании."""
+        with self._metadata_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._metadata_dirty:
+                return
+            dirty, self._metadata_dirty = self._metadata_dirty, set()
+            try:
+                lines = b"".join(
+                    self._metadata_line(self.models.get(mid) or {"model_id": mid, "deleted": True})
+                    for mid in dirty
+                )
+                with open(self.metadata_log, 'ab') as f:
+                    f.write(lines)
+                self._metadata_log_lines += len(dirty)
+                if self._metadata_log_lines > 2 * max(len(self.models), 1):
+                    self._compact_metadata()
+            except Exception as e:
+                self._metadata_dirty |= dirty
+                logger.warning(f"Не удалось сохранить метаданные модели: {e}")
+
+    def _compact_metadata(self):
+        """Переписать журнал метаданных, оставив по одной записи на модель."""
+        tmp_path = f"{self.metadata_log}.tmp"
+        with open(tmp_path, 'wb') as f:
+            for info in self.models.values():
+                f.write(self._metadata_line(info))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.metadata_log)
+        self._metadata_log_lines = len(self.models)
 
     def get_available_model_types(self) -> List[str]:
         """
@@ -119,8 +223,8 @@ class ModelService:
         model_type: str,
         dataset_id: str,
         hyperparameters: Dict,
-        X: List[List[float]],
-        y: List[float],
+        X: Union[np.ndarray, List[List[float]]],
+        y: Union[np.ndarray, List[float]],
     ) -> str:
         """
         Обучить модель.
@@ -158,16 +262,20 @@ class ModelService:
 
         model = self.create_model(model_type, hyperparameters)
         metrics = model.train(X, y)
-        
+        clean_metrics = {
+            key: value
+            for key, value in (metrics or {}).items()
+            if isinstance(value, Real) and isfinite(value)
+        }
+
         if task:
-            for metric_name, metric_value in metrics.items():
-                if metric_value is not None and not (isinstance(metric_value, float) and (metric_value != metric_value or metric_value == float('inf'))):
-                    task.logger.report_scalar(
-                        title="Training Metrics",
-                        series=metric_name,
-                        value=float(metric_value),
-                        iteration=1
-                    )
+            for metric_name, metric_value in clean_metrics.items():
+                task.logger.report_scalar(
+                    title="Training Metrics",
+                    series=metric_name,
+                    value=float(metric_value),
+                    iteration=1
+                )
 
         model_path = os.path.join(self.models_dir, f"{model_id}.pkl")
         model.save(model_path)
@@ -178,24 +286,13 @@ class ModelService:
             model_path=model_path,
             hyperparameters=hyperparameters,
             dataset_id=dataset_id,
-            metrics=metrics,
+            metrics=clean_metrics,
             task=task,
         )
         
-        self._save_model_to_minio(model_id, model_path)
-
-        clean_metrics = {}
-        if metrics:
-            import math
-            for key, value in metrics.items():
-                if isinstance(value, float):
-                    if math.isnan(value) or math.isinf(value):
-                        continue
-                    else:
-                        clean_metrics[key] = value
-                elif value is not None:
-                    clean_metrics[key] = value
-        
+        if not clearml_model_id or settings.minio_backup_enabled:
+            self._queue_upload(model_id, model_path)
+
         self.models[model_id] = {
             "model_id": model_id,
             "model_type": model_type,
@@ -207,6 +304,7 @@ class ModelService:
             "clearml_model_id": clearml_model_id,
             "metrics": clean_metrics if clean_metrics else None,
         }
+        self._all_models_cache = None
         
         self._save_model_metadata(model_id)
 
@@ -234,20 +332,28 @@ class ModelService:
         Получить список всех моделей.
 
         Returns:
-            Список словарей с информацией о моделях
+            Список словарей с информацией о моделях (общий, не изменять)
         """
-        return list(self.models.values())
-
-    def _convert_features_to_list(self, features: Union[List[List[float]], List[Dict[str, float]]]) -> List[List[float]]:
+        models = self._all_models_cache
+        if models is None:
+            models = self._all_models_cache = list(self.models.values())
+        return models
+
+    def _convert_features_to_list(
+        self, features: Union[np.ndarray, List[List[float]], List[Dict[str, float]]]
+    ) -> Union[np.ndarray, List[List[float]]]:
         """
-        Конвертировать признаки в список списков.
+        Конвертировать признаки в матрицу или список списков.
         
         Args:
-            features: Признаки в виде списка списков или списка словарей
+            features: Признаки в виде матрицы numpy, списка списков или списка словарей
             
         Returns:
-            Список списков признаков
+            Матрица numpy или список списков признаков
         """
+        if isinstance(features, np.ndarray):
+            return features
+
         if not features:
             return []
         
@@ -255,17 +361,16 @@ class ModelService:
             return features
         
         if isinstance(features[0], dict):
-            keys = list(features[0].keys())
-            keys.sort()
-            
-            result = []
-            for item in features:
-                values = [float(item.get(key, 0.0)) for key in keys]
-                result.append(values)
-            
+            keys = sorted(features[0])
+            result = np.fromiter(
+                (item.get(key, 0.0) for item in features for key in keys),
+                dtype=np.float64,
+                count=len(features) * len(keys),
+            ).reshape(len(features), len(keys))
+
             logger.info(
-                "Конвертированы признаки из словарей в списки",
-                extra={"samples": len(result), "features": len(keys), "keys": keys}
+                "Конвертированы признаки из словарей в матрицу",
+                extra={"samples": len(features), "features": len(keys), "keys": keys}
             )
             return result
         
@@ -277,20 +382,19 @@ class ModelService:
             return
         
         try:
-            bucket_name = "clearml-models"
+            bucket_name = _MINIO_MODELS_BUCKET
             minio_service._ensure_bucket_exists(bucket_name)
             
             object_name = f"models/{model_id}.pkl"
             
-            with open(model_path, 'rb') as file_data:
-                file_stat = os.stat(model_path)
-                minio_service.client.put_object(
-                    bucket_name=bucket_name,
-                    object_name=object_name,
-                    data=file_data,
-                    length=file_stat.st_size,
-                    content_type='application/octet-stream'
-                )
+            minio_service.client.fput_object(
+                bucket_name=bucket_name,
+                object_name=object_name,
+                file_path=model_path,
+                content_type='application/octet-stream',
+                part_size=_MINIO_PART_SIZE,
+                num_parallel_uploads=4,
+            )
             
             logger.info(
                 "Модель сохранена в MinIO",
@@ -303,13 +407,140 @@ class ModelService:
             )
             raise
 
-    def predict(self, model_id: str, features: Union[List[List[float]], List[Dict[str, float]]]) -> List[float]:
+    def _save_models_batch_to_minio(self, batch: List[Tuple[str, str]]):
+        """
+        Сохранить несколько моделей в MinIO tar-архивами.
+
+        MinIO распаковывает архив на своей стороне (Snowball auto-extract),
+        поэтому каждая модель оказывается в models/<model_id>.pkl, как и при
+        поштучной загрузке. Модели группируются по размеру, чтобы каждый архив
+        уходил одним PUT.
+        """
+        batch = [(model_id, model_path) for model_id, model_path in batch if os.path.exists(model_path)]
+        group: List[Tuple[str, str]] = []
+        group_size = 0
+        for model_id, model_path in batch:
+            model_size = os.path.getsize(model_path)
+            if group and group_size + model_size > _SNOWBALL_MAX_SIZE:
+                self._save_snowball_to_minio(group)
+                group, group_size = [], 0
+            group.append((model_id, model_path))
+            group_size += model_size
+        if group:
+            self._save_snowball_to_minio(group)
+
+    def _save_snowball_to_minio(self, batch: List[Tuple[str, str]]):
+        """Загрузить группу моделей одним tar-архивом не больше _SNOWBALL_MAX_SIZE (кроме одиночной модели)."""
+        if len(batch) == 1:
+            self._save_model_to_minio(*batch[0])
+            return
+        if not minio_service.client:
+            return
+
+        model_ids = [model_id for model_id, _ in batch]
+        try:
+            bucket_name = _MINIO_MODELS_BUCKET
+            minio_service._ensure_bucket_exists(bucket_name)
+
+            object_name = f"models/batch-{uuid.uuid4()}.tar"
+
+            with tempfile.SpooledTemporaryFile(max_size=_UPLOAD_SPOOL_SIZE) as buf:
+                with tarfile.open(fileobj=buf, mode="w") as tar:
+                    for model_id, model_path in batch:
+                        tar.add(model_path, arcname=f"models/{model_id}.pkl")
+                length = buf.tell()
+                buf.seek(0)
+                minio_service.client.put_object(
+                    bucket_name=bucket_name,
+                    object_name=object_name,
+                    data=buf,
+                    length=length,
+                    content_type='application/x-tar',
+                    metadata={"X-Amz-Meta-Snowball-Auto-Extract": "true"},
+                    # Часть не меньше архива - иначе multipart и MinIO не распакует его
+                    part_size=max(length, _MINIO_PART_SIZE),
+                )
+
+            logger.info(
+                "Модели сохранены в MinIO пакетом",
+                extra={"model_ids": model_ids, "bucket": bucket_name, "object": object_name}
+            )
+        except Exception as e:
+            logger.error(
+                "Ошибка при пакетном сохранении моделей в MinIO",
+                extra={"error": str(e), "model_ids": model_ids}
+            )
+            raise
+
+    def _queue_upload(self, model_id: str, model_path: str):
+        """Поставить модель в очередь на пакетную загрузку в MinIO."""
+        with self._upload_lock:
+            self._pending_uploads.append((model_id, model_path))
+            flush_now = len(self._pending_uploads) >= _UPLOAD_BATCH_SIZE
+            if not flush_now and self._upload_timer is None:
+                self._upload_timer = threading.Timer(_UPLOAD_BATCH_INTERVAL, self.flush_pending_uploads)
+                self._upload_timer.daemon = True
+                self._upload_timer.start()
+        if flush_now:
+            self.flush_pending_uploads()
+
+    def flush_pending_uploads(self):
+        """Отправить накопленные модели в MinIO одним пакетом в фоне."""
+        with self._upload_lock:
+            if self._upload_timer is not None:
+                self._upload_timer.cancel()
+                self._upload_timer = None
+            if not self._pending_uploads:
+                return
+            batch = list(self._pending_uploads)
+            self._pending_uploads.clear()
+            try:
+                upload = self._upload_executor.submit(self._save_models_batch_to_minio, batch)
+            except RuntimeError:
+                # Пул уже остановлен (завершение интерпретатора) - загружаем синхронно
+                try:
+                    self._save_models_batch_to_minio(batch)
+                except Exception:
+                    logger.exception(
+                        "Не удалось сохранить модели в MinIO при завершении работы",
+                        extra={"model_ids": [model_id for model_id, _ in batch]},
+                    )
+                return
+            for model_id, _ in batch:
+                self._upload_futures[model_id] = upload
+
+        def _forget(done):
+            # Вызывается из потока пула, а flush_pending_uploads пишет в тот же словарь
+            with self._upload_lock:
+                for model_id, _path in batch:
+                    if self._upload_futures.get(model_id) is done:
+                        del self._upload_futures[model_id]
+
+        upload.add_done_callback(_forget)
+
+    def wait_for_upload(self, model_id: str, timeout: Optional[float] = None):
+        """
+        Дождаться завершения фоновой загрузки модели в MinIO.
+
+        Args:
+            model_id: ID модели
+            timeout: Максимальное время ожидания в секундах
+        """
+        self.flush_pending_uploads()
+        with self._upload_lock:
+            upload = self._upload_futures.get(model_id)
+        if upload is not None:
+            futures.wait([upload], timeout=timeout)
+
+    def predict(
+        self, model_id: str, features: Union[np.ndarray, List[List[float]], List[Dict[str, float]]]
+    ) -> List[float]:
         """
         Получить предсказания от модели.
 
         Args:
             model_id: ID модели
-            features: Признаки для предсказания (список списков или список словарей)
+            features: Признаки для предсказания (матрица numpy, список списков или список словарей)
 
         Returns:
             Список предсказаний
@@ -323,39 +554,155 @@ class ModelService:
 
         X = self._convert_features_to_list(features)
 
+        model = self._get_loaded_model(model_id, model_info)
+        return model.predict(X)
+
+    def predict_batch(
+        self, features_by_model: Dict[str, Union[np.ndarray, List[List[float]], List[Dict[str, float]]]]
+    ) -> Dict[str, List[float]]:
+        """
+        Получить предсказания сразу от нескольких моделей.
+
+        Модели, которых нет в кэше, загружаются параллельно до начала предсказаний.
+
+        Args:
+            features_by_model: Признаки для предсказания по ID модели
+
+        Returns:
+            Списки предсказаний по ID модели
+
+        Raises:
+            ValueError: Если какая-либо модель не найдена
+        """
+        for model_id in features_by_model:
+            if model_id not in self.models:
+                raise ValueError(f"Модель {model_id} не найдена")
+
+        with self._loaded_models_lock:
+            missing = [model_id for model_id in features_by_model if model_id not in self._loaded_models]
+        if len(missing) > 1:
+            with futures.ThreadPoolExecutor(
+                max_workers=min(_PREFETCH_WORKERS, len(missing)), thread_name_prefix="model-prefetch"
+            ) as pool:
+                list(pool.map(lambda model_id: self._get_loaded_model(model_id, self.models[model_id]), missing))
+
+        return {
+            model_id: self.predict(model_id, features)
+            for model_id, features in features_by_model.items()
+        }
+
+    def _get_loaded_model(self, model_id: str, model_info: Dict) -> BaseMLModel:
+        """
+        Получить загруженную модель из LRU-кэша или загрузить ее.
+
+        Args:
+            model_id: ID модели
+            model_info: Информация о модели
+
+        Returns:
+            Загруженный экземпляр модели
+        """
+        with self._loaded_models_lock:
+            model = self._loaded_models.get(model_id)
+            if model is not None:
+                self._loaded_models.move_to_end(model_id)
+                return model
+
+        model = self._load_model(model_id, model_info)
+
+        with self._loaded_models_lock:
+            self._loaded_models[model_id] = model
+            self._loaded_models.move_to_end(model_id)
+            while len(self._loaded_models) > settings.model_cache_size:
+                self._loaded_models.popitem(last=False)
+        return model
+
+    def _local_model_path(self, model_id: str, model_info: Dict) -> Optional[str]:
+        """
+        Получить путь к локальному файлу модели, при необходимости скачав его из MinIO.
+
+        Args:
+            model_id: ID модели
+            model_info: Информация о модели
+
+        Returns:
+            Путь к файлу модели или None, если файл недоступен
+        """
+        model_path = model_info.get("model_path")
+        if not model_path:
+            return None
+        if os.path.exists(model_path):
+            return model_path
+        if not minio_service.client:
+            return None
+
+        try:
+            minio_service.client.fget_object(
+                _MINIO_MODELS_BUCKET, f"models/{model_id}.pkl", model_path
+            )
+        except Exception as e:
+            logger.warning(f"Не удалось загрузить модель {model_id} из MinIO: {e}")
+            return None
+        logger.info(f"Модель {model_id} загружена из MinIO")
+        return model_path
+
+    def _load_model(self, model_id: str, model_info: Dict) -> BaseMLModel:
+        """
+        Загрузить модель из ClearML, с локального диска или из резервной копии в MinIO.
+
+        Args:
+            model_id: ID модели
+            model_info: Информация о модели
+
+        Returns:
+            Загруженный экземпляр модели
+
+        Raises:
+            ValueError: Если модель не может быть загружена
+        """
+        model_path, source = self._resolve_model_path(model_id, model_info)
         model = self.create_model(
             model_info["model_type"], model_info["hyperparameters"]
         )
+        model.load(model_path)
+        logger.info(f"Модель {model_id} загружена {source}")
+        return model
+
+    def _resolve_model_path(self, model_id: str, model_info: Dict) -> Tuple[str, str]:
+        """
+        Найти файл модели: сначала в ClearML, затем локально или в MinIO.
+
+        Args:
+            model_id: ID модели
+            model_info: Информация о модели
+
+        Returns:
+            Кортеж (путь к файлу, описание источника для лога)
+
+        Raises:
+            ValueError: Если файл модели недоступен
+        """
         clearml_model_id = model_info.get("clearml_model_id")
         if clearml_model_id:
             model_path = self.clearml_service.load_model(clearml_model_id, model_id)
             if model_path and os.path.exists(model_path):
-                model.load(model_path)
-                logger.info(f"Модель {model_id} загружена из ClearML")
-            else:
-                model_path = model_info.get("model_path")
-                if model_path and os.path.exists(model_path):
-                    model.load(model_path)
-                    logger.info(f"Модель {model_id} загружена локально")
-                else:
-                    raise ValueError(f"Модель {model_id} не может быть загружена (ни из ClearML, ни локально)")
-        else:
-            model_path = model_info.get("model_path")
-            if model_path and os.path.exists(model_path):
-                model.load(model_path)
-                logger.info(f"Модель {model_id} загружена локально")
-            else:
-                raise ValueError(f"Модель {model_id} не найдена локально и нет ClearML ID")
+                return model_path, "из ClearML"
 
-        return model.predict(X)
+        model_path = self._local_model_path(model_id, model_info)
+        if model_path:
+            return model_path, "локально"
+
+        if clearml_model_id:
+            raise ValueError(f"Модель {model_id} не может быть загружена (ни из ClearML, ни локально)")
+        raise ValueError(f"Модель {model_id} не найдена локально и нет ClearML ID")
 
     def retrain_model(
         self,
         model_id: str,
         dataset_id: str,
         hyperparameters: Optional[Dict],
-        X: List[List[float]],
-        y: List[float],
+        X: Union[np.ndarray, List[List[float]]],
+        y: Union[np.ndarray, List[float]],
     ) -> str:
         """
         Переобучить модель.
@@ -391,29 +738,6 @@ class ModelService:
 
         return new_model_id
 
-    def _save_model_metadata(self, model_id: Optional[str] = None):
-        """Сохранить метаданные моделей в файл."""
-        try:
-            data = {}
-            for mid, info in self.models.items():
-                if model_id is None or mid == model_id:
-                    info_copy = info.copy()
-                    if isinstance(info_copy.get('created_at'), datetime):
-                        info_copy['created_at'] = info_copy['created_at'].isoformat()
-                    data[mid] = info_copy
-            
-            all_data = {}
-            if os.path.exists(self.metadata_file):
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    all_data = json.load(f)
-            
-            all_data.update(data)
-            
-            with open(self.metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(all_data, f, indent=2, ensure_ascii=False, default=str)
-        except Exception as e:
-            logger.warning(f"Не удалось сохранить метаданные модели: {e}")
-
     def delete_model(self, model_id: str) -> bool:
         """
         Удалить модель.
@@ -434,6 +758,11 @@ class ModelService:
             os.remove(model_path)
 
         del self.models[model_id]
+        self._all_models_cache = None
+        self._save_model_metadata(model_id)
+        with self._loaded_models_lock:
+            self._loaded_models.pop(model_id, None)
+        predict_cache.invalidate(model_id)
 
         logger.info("Модель удалена")
         return True
@@ -1,17 +1,34 @@
 """Streamlit дашборд для ML Service."""
 
+import functools
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import numpy as np
 import pandas as pd
-import json
+import pyarrow as pa
+import orjson
 import requests
 import os
-from typing import Dict, Any, List
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.fields import format_multipart_header_param
+from urllib3.filepost import choose_boundary
+from urllib3.util import Retry
+from typing import BinaryIO, Callable, Dict, Any, Iterator, List, Optional, Tuple
 import io
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 
 DOCKER_API_URL = os.getenv("API_BASE_URL", "http://ml-api:8000")
 BROWSER_API_URL = os.getenv("BROWSER_API_URL", "http://localhost:8000")
 IS_DOCKER = os.path.exists("/.dockerenv")
 DEFAULT_URL = DOCKER_API_URL if IS_DOCKER else BROWSER_API_URL
+PREDICT_CHUNK_SIZE = int(os.getenv("PREDICT_CHUNK_SIZE", "10000"))
+SKELETON_DELAY = 0.05
+HEALTH_TIMEOUT = 2
+UPLOAD_TIMEOUT = 300
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
 
 API_BASE_URL = st.sidebar.text_input(
     "API URL", 
@@ -75,16 +92,54 @@ st.markdown("""
     button[kind="primary"]:hover {
         background-color: #1565a0 !important;
     }
-    /* Красные кнопки для удаления */
-    .stButton > button[kind="secondary"] {
-        background-color: #1f77b4 !important;
+    /* Красные кнопки для удаления: контейнер кнопки получает класс st-key-<key> */
+    [class*="st-key-delete_"] button {
+        background-color: #dc3545 !important;
+        border-color: #dc3545 !important;
         color: white !important;
     }
-    /* Специальный стиль для кнопок удаления через JavaScript */
+    [class*="st-key-delete_"] button:hover {
+        background-color: #c82333 !important;
+    }
 </style>
 """, unsafe_allow_html=True)
 
 
+_TIMEOUTS = {"GET": 10, "POST": 30, "DELETE": 10}
+
+
+@st.cache_resource
+def get_http() -> requests.Session:
+    """
+    Получить общую HTTP-сессию с пулом keep-alive соединений.
+
+    Сессия разделяется между перезапусками скрипта и не должна изменяться:
+    параметры конкретного запроса передаются в request().
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504]),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_data(ttl="30s", max_entries=64, show_spinner=False)
+def _get_json(url: str) -> Any:
+    """
+    Выполнить GET запрос к API с кэшированием ответа.
+
+    Ошибки не кэшируются: исключение пробрасывается вызывающему коду.
+    После изменяющих запросов кэш сбрасывается через _get_json.clear().
+    """
+    response = get_http().get(url, timeout=_TIMEOUTS["GET"])
+    response.raise_for_status()
+    return response.json()
+
+
 def make_request(method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
     """
     Выполнить HTTP запрос к API.
@@ -92,7 +147,7 @@ def make_request(method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
     Args:
         method: HTTP метод
         endpoint: Эндпоинт API
-        **kwargs: Дополнительные параметры для requests
+        **kwargs: Дополнительные параметры для requests (timeout заменяет таймаут метода)
 
     Returns:
         Ответ API в виде словаря
@@ -100,89 +155,251 @@ def make_request(method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
     url = f"{API_BASE_URL}{endpoint}"
     try:
         if method == "GET":
-            response = requests.get(url, timeout=10)
-        elif method == "POST":
-            response = requests.post(url, **kwargs, timeout=30)
-        elif method == "DELETE":
-            response = requests.delete(url, timeout=10)
-        else:
+            return _get_json(url)
+        if method not in _TIMEOUTS:
             return {"error": f"Неподдерживаемый метод: {method}"}
 
+        kwargs.setdefault("timeout", _TIMEOUTS[method])
+        response = get_http().request(method, url, **kwargs)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         return {"error": str(e)}
 
 
-def check_health() -> bool:
-    """Проверить статус API."""
-    result = make_request("GET", "/api/v1/health")
-    if "error" in result:
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """Получить общий пул потоков для параллельных запросов к API."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="api-fetch")
+
+
+def submit_request(method: str, endpoint: str) -> Future:
+    """
+    Выполнить make_request в общем пуле потоков.
+
+    Потоку пула передается контекст текущего запуска скрипта, иначе
+    st.cache_data и другие вызовы st.* из него не видят сессию. Потоки пула
+    переиспользуются, поэтому контекст задается заново для каждой задачи.
+    """
+    ctx = get_script_run_ctx()
+
+    def run() -> Dict[str, Any]:
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return make_request(method, endpoint)
+
+    return get_executor().submit(run)
+
+
+def fetch_all(endpoints: List[str]) -> Dict[str, Any]:
+    """
+    Выполнить несколько GET запросов к API параллельно.
+
+    Ответы попадают в кэш _get_json, поэтому повторные make_request("GET", ...)
+    к тем же эндпоинтам не обращаются к API.
+
+    Args:
+        endpoints: Список эндпоинтов API
+
+    Returns:
+        Ответы API по эндпоинтам
+    """
+    futures = {
+        endpoint: submit_request("GET", endpoint)
+        for endpoint in endpoints
+    }
+    return {endpoint: future.result() for endpoint, future in futures.items()}
+
+
+def fetch_with_skeleton(endpoint: str, count_key: str) -> Dict[str, Any]:
+    """
+    Выполнить GET запрос списка, показывая заглушки, пока ответ не получен.
+
+    Если ответ приходит быстрее SKELETON_DELAY (например, из кэша), заглушки
+    не выводятся. Их количество берется из размера списка при прошлой загрузке.
+
+    Args:
+        endpoint: Эндпоинт API
+        count_key: Ключ st.session_state с размером списка
+
+    Returns:
+        Ответ API
+    """
+    future = submit_request("GET", endpoint)
+    done, _ = wait([future], timeout=SKELETON_DELAY)
+    if not done:
+        skeleton = st.empty()
+        skeleton.dataframe(
+            pd.DataFrame({"⏳": ["Загрузка..."] * st.session_state.get(count_key, 3)}),
+            use_container_width=True,
+            hide_index=True,
+        )
+        wait([future])
+        skeleton.empty()
+
+    result = future.result()
+    if isinstance(result, list):
+        st.session_state[count_key] = len(result)
+    return result
+
+
+def select_row(df: pd.DataFrame, key: str, column_config: Dict[str, Any]) -> Optional[int]:
+    """
+    Вывести таблицу с выбором одной строки и вернуть номер выбранной строки.
+
+    Ключ таблицы должен меняться вместе с составом списка, иначе после удаления
+    или обновления выбор останется на той же позиции, но уже на другом элементе.
+
+    Args:
+        df: Таблица для вывода
+        key: Ключ виджета таблицы
+        column_config: Настройки столбцов st.dataframe
+
+    Returns:
+        Номер выбранной строки или None
+    """
+    event = st.dataframe(
+        df,
+        column_config=column_config,
+        use_container_width=True,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=key,
+    )
+    rows = event["selection"]["rows"]
+    return rows[0] if rows else None
+
+
+def rerun_fragment():
+    """
+    Перезапустить только текущий фрагмент.
+
+    Если фрагмент выполняется в составе полного перезапуска страницы (например,
+    несколько событий объединились в один запуск), перезапускается вся страница.
+    """
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+
+@st.cache_data(ttl="10s", show_spinner=False)
+def check_health(base_url: str) -> bool:
+    """Проверить статус API, результат (в том числе неудачный) кэшируется на 10 секунд."""
+    try:
+        response = get_http().get(f"{base_url}/api/v1/health", timeout=HEALTH_TIMEOUT)
+        return response.ok and response.json().get("status") == "healthy"
+    except (requests.exceptions.RequestException, ValueError):
         return False
-    return result.get("status") == "healthy"
 
 
-def get_default_hyperparameters(model_type: str) -> Dict[str, Any]:
-    """Получить гиперпараметры по умолчанию для модели."""
-    defaults = {
-        "linear": {
-            "alpha": 1.0,
-            "max_iter": 1000,
-            "tol": 0.0001,
-            "solver": "auto"
-        },
-        "random_forest": {
-            "n_estimators": 100,
-            "max_depth": None,
-            "min_samples_split": 2,
-            "min_samples_leaf": 1,
-            "random_state": 42
-        }
+@st.fragment(run_every="10s")
+def health_banner_fragment():
+    """Баннер недоступности API, обновляется независимо от остальной страницы."""
+    if not check_health(API_BASE_URL):
+        st.error(f"⚠️ Не удалось подключиться к API по адресу {API_BASE_URL}")
+        st.info("💡 Попробуйте изменить URL в боковой панели или проверьте что API запущен")
+
+
+DEFAULT_HYPERPARAMETERS = {
+    "linear": {
+        "alpha": 1.0,
+        "max_iter": 1000,
+        "tol": 0.0001,
+        "solver": "auto"
+    },
+    "random_forest": {
+        "n_estimators": 100,
+        "max_depth": None,
+        "min_samples_split": 2,
+        "min_samples_leaf": 1,
+        "random_state": 42
     }
-    return defaults.get(model_type, {})
+}
 
 
-st.markdown("""
-<script>
-    // Ждем загрузки DOM
-    setTimeout(function() {
-        // Находим все кнопки с текстом "🗑️ Удалить"
-        const buttons = document.querySelectorAll('button');
-        buttons.forEach(function(button) {
-            if (button.textContent.includes('🗑️')) {
-                button.style.backgroundColor = '#dc3545';
-                button.style.color = 'white';
-                button.style.borderColor = '#dc3545';
-                button.addEventListener('mouseenter', function() {
-                    this.style.backgroundColor = '#c82333';
-                });
-                button.addEventListener('mouseleave', function() {
-                    this.style.backgroundColor = '#dc3545';
-                });
-            }
-        });
-    }, 100);
-</script>
-""", unsafe_allow_html=True)
+@functools.cache
+def get_default_hyperparameters(model_type: str) -> Tuple[Dict[str, Any], str]:
+    """
+    Получить гиперпараметры по умолчанию для модели и их JSON-представление.
 
-health_status = check_health()
-if not health_status:
-    st.error(f"⚠️ Не удалось подключиться к API по адресу {API_BASE_URL}")
-    st.info("💡 Попробуйте изменить URL в боковой панели или проверьте что API запущен")
+    Результат вычисляется один раз на тип модели и не должен изменяться.
+    """
+    defaults = DEFAULT_HYPERPARAMETERS.get(model_type, {})
+    return defaults, orjson.dumps(defaults, option=orjson.OPT_INDENT_2).decode()
 
-st.sidebar.title("🤖 ML Service Dashboard")
-st.sidebar.markdown("---")
 
-page = st.sidebar.selectbox(
-    "📋 Выберите раздел",
-    ["📊 Датасеты", "🎓 Обучение", "🔮 Инференс"],
-    format_func=lambda x: x.split(" ", 1)[1] if " " in x else x
-)
+@functools.lru_cache(maxsize=16)
+def build_options(items: Tuple[Tuple[str, str], ...]) -> Dict[str, str]:
+    """
+    Построить варианты выбора "подпись (id...)" -> id для selectbox.
 
-if page == "📊 Датасеты":
-    st.markdown('<h1 class="main-header">📊 Управление датасетами</h1>', unsafe_allow_html=True)
+    Args:
+        items: Пары (id, подпись); одинаковые списки дают попадание в кэш
+
+    Returns:
+        Словарь вариантов, общий для всех сессий и не должен изменяться
+    """
+    return {f"{label} ({item_id[:8]}...)": item_id for item_id, label in items}
+
+
+class MultipartUpload:
+    """
+    Тело multipart/form-data с одним файлом, которое читает файл частями при отправке.
 
+    requests отправляет итерируемое тело по мере чтения, а длина известна заранее,
+    поэтому запрос уходит с Content-Length и без копии файла в памяти.
+    """
+
+    def __init__(
+        self,
+        file_name: str,
+        file_obj: BinaryIO,
+        size: int,
+        fields: Dict[str, str],
+        on_progress: Optional[Callable[[float], Any]] = None,
+    ):
+        boundary = choose_boundary()
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        head = "".join(
+            f'--{boundary}\r\nContent-Disposition: form-data; {format_multipart_header_param("name", name)}\r\n\r\n{value}\r\n'
+            for name, value in fields.items()
+        )
+        head += (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; '
+            f'{format_multipart_header_param("filename", file_name)}\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        )
+        self._head = head.encode()
+        self._tail = f"\r\n--{boundary}--\r\n".encode()
+        self._file_obj = file_obj
+        self._size = size
+        self._on_progress = on_progress
+
+    def __len__(self) -> int:
+        return len(self._head) + self._size + len(self._tail)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self._head
+        sent = 0
+        while chunk := self._file_obj.read(UPLOAD_CHUNK_SIZE):
+            sent += len(chunk)
+            if self._on_progress is not None:
+                self._on_progress(min(sent / max(self._size, 1), 1.0))
+            yield chunk
+        yield self._tail
+
+
+@st.fragment
+def dataset_upload_fragment():
+    """Форма загрузки датасета."""
     st.markdown("### 📤 Загрузка датасета")
+
+    upload_result = st.session_state.pop("upload_result", None)
+    if upload_result:
+        st.success(f"✅ Датасет {upload_result.get('file_name', upload_result.get('filename', 'Unknown'))} успешно загружен!")
+        st.markdown(f'<div class="success-box">📦 <strong>ID:</strong> {upload_result["dataset_id"]}<br>📏 <strong>Размер:</strong> {upload_result["size"]} байт</div>', unsafe_allow_html=True)
+
     uploaded_file = st.file_uploader(
         "Выберите файл датасета (CSV или JSON)", 
         type=["csv", "json"],
@@ -197,111 +414,134 @@ if page == "📊 Датасеты":
             st.write("")  # Отступ
             st.write("")  # Отступ
             if st.button("📥 Загрузить", type="primary", use_container_width=True):
-                files = {"file": (uploaded_file.name, uploaded_file.getvalue())}
-                data = {"format": format_type}
+                progress = st.progress(0.0, text="📤 Отправка файла...")
+                uploaded_file.seek(0)
+                body = MultipartUpload(
+                    uploaded_file.name,
+                    uploaded_file,
+                    uploaded_file.size,
+                    {"format": format_type},
+                    on_progress=progress.progress,
+                )
                 result = make_request(
-                    "POST", "/api/v1/datasets/upload", files=files, data=data
+                    "POST",
+                    "/api/v1/datasets/upload",
+                    data=body,
+                    headers={"Content-Type": body.content_type},
+                    timeout=UPLOAD_TIMEOUT,
                 )
+                progress.empty()
                 if "error" in result:
                     st.error(f"❌ Ошибка: {result['error']}")
                 else:
-                    st.success(f"✅ Датасет {result.get('file_name', result.get('filename', 'Unknown'))} успешно загружен!")
-                    st.markdown(f'<div class="success-box">📦 <strong>ID:</strong> {result["dataset_id"]}<br>📏 <strong>Размер:</strong> {result["size"]} байт</div>', unsafe_allow_html=True)
+                    _get_json.clear()
+                    st.session_state["upload_result"] = result
+                    st.rerun()
 
-    st.markdown("---")
 
+@st.fragment
+def dataset_list_fragment():
+    """Список загруженных датасетов."""
     st.markdown("### 📋 Список датасетов")
     if st.button("🔄 Обновить список", use_container_width=True):
-        st.rerun()
+        _get_json.clear()
 
-    datasets_result = make_request("GET", "/api/v1/datasets")
+    if st.session_state.pop("dataset_deleted", False):
+        st.success("✅ Датасет удален!")
+
+    # После удаления список уже исправлен локально, повторно запрашивать его не нужно
+    datasets_result = st.session_state.pop("datasets_after_delete", None)
+    if datasets_result is None:
+        datasets_result = fetch_with_skeleton("/api/v1/datasets", "last_dataset_count")
     if "error" in datasets_result:
         st.error(f"❌ Ошибка при получении списка датасетов: {datasets_result['error']}")
-    else:
-        datasets = datasets_result if isinstance(datasets_result, list) else []
-        if datasets:
-            for dataset in datasets:
-                with st.expander(
-                    f"📊 {dataset.get('file_name', dataset.get('filename', 'Unknown'))} (ID: {dataset['dataset_id'][:8]}...)"
-                ):
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("📏 Размер", f"{dataset['size']:,} байт")
-                    with col2:
-                        st.metric("📅 Создан", dataset['created_at'][:10])
-                    with col3:
-                        if dataset.get("dvc_version"):
-                            st.metric("🔖 DVC версия", dataset['dvc_version'][:8] + "...")
-                        else:
-                            st.metric("🔖 DVC версия", "N/A")
-
-                    if st.button(
-                        "🗑️ Удалить", 
-                        key=f"delete_{dataset['dataset_id']}",
-                        use_container_width=True
-                    ):
-                        result = make_request(
-                            "DELETE", f"/api/v1/datasets/{dataset['dataset_id']}"
-                        )
-                        if "error" in result:
-                            st.error(f"❌ Ошибка: {result['error']}")
-                        else:
-                            st.success("✅ Датасет удален!")
-                            st.rerun()
-        else:
-            st.info("ℹ️ Нет загруженных датасетов. Загрузите первый датасет выше.")
-
-elif page == "🎓 Обучение":
-    st.markdown('<h1 class="main-header">🎓 Обучение моделей</h1>', unsafe_allow_html=True)
+        return
 
-    models_result = make_request("GET", "/api/v1/models/available")
-    if "error" in models_result:
-        st.error(f"❌ Ошибка: {models_result['error']}")
-        st.stop()
-
-    available_models = models_result if isinstance(models_result, list) else []
+    datasets = datasets_result if isinstance(datasets_result, list) else []
+    if not datasets:
+        st.info("ℹ️ Нет загруженных датасетов. Загрузите первый датасет выше.")
+        return
 
-    datasets_result = make_request("GET", "/api/v1/datasets")
-    datasets = (
-        datasets_result if isinstance(datasets_result, list) and "error" not in datasets_result else []
+    df = pd.DataFrame(datasets).reindex(
+        columns=["file_name", "dataset_id", "size", "created_at", "dvc_version"]
     )
+    df["created_at"] = df["created_at"].str[:10]
+    selected = select_row(
+        df,
+        key=f"datasets_table_{hash(tuple(df['dataset_id']))}",
+        column_config={
+            "file_name": st.column_config.TextColumn("📊 Файл"),
+            "dataset_id": st.column_config.TextColumn("ID"),
+            "size": st.column_config.NumberColumn("📏 Размер", format="%d байт"),
+            "created_at": st.column_config.TextColumn("📅 Создан"),
+            "dvc_version": st.column_config.TextColumn("🔖 DVC версия"),
+        },
+    )
+    if selected is None:
+        st.caption("Выберите строку таблицы, чтобы удалить датасет")
+        return
+
+    dataset = datasets[selected]
+    if st.button(
+        f"🗑️ Удалить {dataset.get('file_name', 'Unknown')}",
+        key=f"delete_{dataset['dataset_id']}",
+        use_container_width=True
+    ):
+        result = make_request(
+            "DELETE", f"/api/v1/datasets/{dataset['dataset_id']}"
+        )
+        if "error" in result:
+            st.error(f"❌ Ошибка: {result['error']}")
+        else:
+            _get_json.clear(f"{API_BASE_URL}/api/v1/datasets")
+            st.session_state["datasets_after_delete"] = [
+                d for d in datasets if d["dataset_id"] != dataset["dataset_id"]
+            ]
+            st.session_state["dataset_deleted"] = True
+            rerun_fragment()
 
-    if not datasets:
-        st.warning("⚠️ Сначала загрузите датасет в разделе '📊 Датасеты'")
-        st.stop()
 
+@st.fragment
+def train_form_fragment(available_models: List[str], datasets: List[Dict[str, Any]]):
+    """Форма настройки и запуска обучения модели."""
     st.markdown("### ⚙️ Настройка обучения")
 
     col1, col2 = st.columns(2)
     with col1:
         model_type = st.selectbox("🤖 Тип модели", available_models)
     with col2:
-        dataset_options = {
-            f"{d.get('file_name', d.get('filename', 'Unknown'))} ({d['dataset_id'][:8]}...)": d["dataset_id"]
-            for d in datasets
-        }
+        dataset_options = build_options(
+            tuple((d["dataset_id"], d.get("file_name", d.get("filename", "Unknown"))) for d in datasets)
+        )
         selected_dataset = st.selectbox("📊 Датасет", list(dataset_options.keys()))
         dataset_id = dataset_options[selected_dataset]
 
     st.markdown("### 🎛️ Гиперпараметры")
     
-    default_params = get_default_hyperparameters(model_type)
+    default_params, default_params_json = get_default_hyperparameters(model_type)
     st.info(f"💡 **Подсказка:** Для модели **{model_type}** доступны параметры: {', '.join(default_params.keys())}")
     
     if st.button("📋 Загрузить параметры по умолчанию", use_container_width=True):
-        st.session_state.default_hyperparams = json.dumps(default_params, indent=2)
+        st.session_state.default_hyperparams = default_params_json
     
     hyperparameters_json = st.text_area(
         "JSON с гиперпараметрами",
-        value=st.session_state.get("default_hyperparams", json.dumps(default_params, indent=2)),
+        value=st.session_state.get("default_hyperparams", default_params_json),
         height=200,
-        help=f'Пример для {model_type}: {json.dumps(default_params, indent=2)}',
+        help=f'Пример для {model_type}: {default_params_json}',
     )
 
-    try:
-        hyperparameters = json.loads(hyperparameters_json)
-    except json.JSONDecodeError as e:
-        st.error(f"❌ Неверный формат JSON: {e}")
+    # Текст разбирается заново только после изменения, результат хранится в сессии
+    if st.session_state.get("hp_text") != hyperparameters_json:
+        try:
+            st.session_state["hp_parsed"] = orjson.loads(hyperparameters_json)
+        except orjson.JSONDecodeError as e:
+            st.session_state["hp_parsed"] = e
+        st.session_state["hp_text"] = hyperparameters_json
+
+    hyperparameters = st.session_state["hp_parsed"]
+    if isinstance(hyperparameters, orjson.JSONDecodeError):
+        st.error(f"❌ Неверный формат JSON: {hyperparameters}")
         hyperparameters = default_params
 
     if st.button("🚀 Обучить модель", type="primary", use_container_width=True):
@@ -316,116 +556,128 @@ elif page == "🎓 Обучение":
                 },
             )
 
-            if "error" in result:
-                st.error(f"❌ Ошибка при обучении: {result['error']}")
-            else:
-                st.success("✅ Модель успешно обучена!")
-                
-                if result.get("metrics"):
-                    st.markdown("### 📊 Метрики модели")
-                    metrics = result["metrics"]
-                    col1, col2, col3, col4 = st.columns(4)
-                    with col1:
-                        st.metric("R² Score", f"{metrics.get('r2_score', 0):.4f}")
-                    with col2:
-                        st.metric("MAE", f"{metrics.get('mae', 0):.4f}")
-                    with col3:
-                        st.metric("MSE", f"{metrics.get('mse', 0):.4f}")
-                    with col4:
-                        st.metric("RMSE", f"{metrics.get('rmse', 0):.4f}")
-                
-                st.markdown(f'<div class="success-box"><strong>📦 ID модели:</strong> {result["model_id"]}</div>', unsafe_allow_html=True)
-
-    st.markdown("---")
-
+        if "error" in result:
+            st.error(f"❌ Ошибка при обучении: {result['error']}")
+        else:
+            _get_json.clear()
+            st.session_state["train_result"] = result
+            st.rerun()
+
+    train_result = st.session_state.pop("train_result", None)
+    if train_result:
+        st.success("✅ Модель успешно обучена!")
+        
+        if train_result.get("metrics"):
+            st.markdown("### 📊 Метрики модели")
+            metrics = train_result["metrics"]
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("R² Score", f"{metrics.get('r2_score', 0):.4f}")
+            with col2:
+                st.metric("MAE", f"{metrics.get('mae', 0):.4f}")
+            with col3:
+                st.metric("MSE", f"{metrics.get('mse', 0):.4f}")
+            with col4:
+                st.metric("RMSE", f"{metrics.get('rmse', 0):.4f}")
+        
+        st.markdown(f'<div class="success-box"><strong>📦 ID модели:</strong> {train_result["model_id"]}</div>', unsafe_allow_html=True)
+
+
+@st.fragment
+def models_list_fragment():
+    """Список обученных моделей."""
     st.markdown("### 📋 Обученные модели")
     if st.button("🔄 Обновить список моделей", use_container_width=True):
-        st.rerun()
+        _get_json.clear()
 
-    models_result = make_request("GET", "/api/v1/models")
-    if "error" in models_result:
-        st.error(f"❌ Ошибка: {models_result['error']}")
-    else:
-        models = models_result if isinstance(models_result, list) else []
-        if models:
-            for model in models:
-                with st.expander(
-                    f"🤖 {model['model_type']} (ID: {model['model_id'][:8]}...)"
-                ):
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("📊 Статус", model['status'])
-                    with col2:
-                        st.metric("📦 Датасет", model['dataset_id'][:8] + "...")
-                    with col3:
-                        st.metric("📅 Создана", model['created_at'][:10])
-
-                    if model.get("metrics"):
-                        st.markdown("**📊 Метрики:**")
-                        metrics = model["metrics"]
-                        col1, col2, col3, col4 = st.columns(4)
-                        with col1:
-                            st.metric("R²", f"{metrics.get('r2_score', 0):.4f}")
-                        with col2:
-                            st.metric("MAE", f"{metrics.get('mae', 0):.4f}")
-                        with col3:
-                            st.metric("MSE", f"{metrics.get('mse', 0):.4f}")
-                        with col4:
-                            st.metric("RMSE", f"{metrics.get('rmse', 0):.4f}")
-
-                    st.markdown("**⚙️ Гиперпараметры:**")
-                    st.json(model["hyperparameters"])
-
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button(
-                            "🔄 Переобучить", 
-                            key=f"retrain_{model['model_id']}",
-                            use_container_width=True
-                        ):
-                            st.info("💡 Используйте форму выше для переобучения")
-                    with col2:
-                        delete_model_btn = st.button(
-                            "🗑️ Удалить", 
-                            key=f"delete_model_{model['model_id']}",
-                            use_container_width=True,
-                            type="secondary"
-                        )
-                        if delete_model_btn:
-                            result = make_request(
-                                "DELETE", f"/api/v1/models/{model['model_id']}"
-                            )
-                            if "error" in result:
-                                st.error(f"❌ Ошибка: {result['error']}")
-                            else:
-                                st.success("✅ Модель удалена!")
-                                st.rerun()
-        else:
-            st.info("ℹ️ Нет обученных моделей. Обучите первую модель выше.")
-
-# Страница: Инференс
-elif page == "🔮 Инференс":
-    st.markdown('<h1 class="main-header">🔮 Получение предсказаний</h1>', unsafe_allow_html=True)
+    if st.session_state.pop("model_deleted", False):
+        st.success("✅ Модель удалена!")
 
-    models_result = make_request("GET", "/api/v1/models")
+    models_result = st.session_state.pop("models_after_delete", None)
+    if models_result is None:
+        models_result = fetch_with_skeleton("/api/v1/models", "last_model_count")
     if "error" in models_result:
         st.error(f"❌ Ошибка: {models_result['error']}")
-        st.stop()
+        return
 
     models = models_result if isinstance(models_result, list) else []
     if not models:
-        st.warning("⚠️ Сначала обучите модель в разделе '🎓 Обучение'")
-        st.stop()
-
-    model_options = {
-        f"{m['model_type']} ({m['model_id'][:8]}...)": m["model_id"]
+        st.info("ℹ️ Нет обученных моделей. Обучите первую модель выше.")
+        return
+
+    df = pd.DataFrame([
+        {
+            "model_type": m["model_type"],
+            "model_id": m["model_id"],
+            "status": m["status"],
+            "dataset_id": m["dataset_id"],
+            "created_at": m["created_at"][:10],
+            **(m.get("metrics") or {}),
+        }
         for m in models
-    }
-    selected_model = st.selectbox("🤖 Выберите модель", list(model_options.keys()))
-    model_id = model_options[selected_model]
+    ]).reindex(columns=["model_type", "model_id", "status", "dataset_id", "created_at", "r2_score", "mae", "mse", "rmse"])
+    selected = select_row(
+        df,
+        key=f"models_table_{hash(tuple(df['model_id']))}",
+        column_config={
+            "model_type": st.column_config.TextColumn("🤖 Тип"),
+            "model_id": st.column_config.TextColumn("ID"),
+            "status": st.column_config.TextColumn("📊 Статус"),
+            "dataset_id": st.column_config.TextColumn("📦 Датасет"),
+            "created_at": st.column_config.TextColumn("📅 Создана"),
+            "r2_score": st.column_config.NumberColumn("R²", format="%.4f"),
+            "mae": st.column_config.NumberColumn("MAE", format="%.4f"),
+            "mse": st.column_config.NumberColumn("MSE", format="%.4f"),
+            "rmse": st.column_config.NumberColumn("RMSE", format="%.4f"),
+        },
+    )
+    if selected is None:
+        st.caption("Выберите строку таблицы, чтобы посмотреть гиперпараметры или удалить модель")
+        return
 
-    st.markdown("---")
+    model = models[selected]
+    st.markdown("**⚙️ Гиперпараметры:**")
+    st.json(model["hyperparameters"])
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button(
+            "🔄 Переобучить", 
+            key=f"retrain_{model['model_id']}",
+            use_container_width=True
+        ):
+            st.info("💡 Используйте форму выше для переобучения")
+    with col2:
+        delete_model_btn = st.button(
+            "🗑️ Удалить", 
+            key=f"delete_model_{model['model_id']}",
+            use_container_width=True,
+            type="secondary"
+        )
+        if delete_model_btn:
+            result = make_request(
+                "DELETE", f"/api/v1/models/{model['model_id']}"
+            )
+            if "error" in result:
+                st.error(f"❌ Ошибка: {result['error']}")
+            else:
+                _get_json.clear(f"{API_BASE_URL}/api/v1/models")
+                st.session_state["models_after_delete"] = [
+                    m for m in models if m["model_id"] != model["model_id"]
+                ]
+                st.session_state["model_deleted"] = True
+                rerun_fragment()
 
+
+@st.fragment
+def features_input_fragment():
+    """
+    Ввод признаков для предсказания.
+
+    Результат сохраняется в st.session_state["features"], поэтому ввод
+    значений перезапускает только этот фрагмент. Для CSV сохраняется сам
+    загруженный файл, чтобы не держать его целиком в памяти в виде списков.
+    """
     st.markdown("### 📥 Ввод признаков")
 
     input_method = st.radio(
@@ -444,38 +696,47 @@ elif page == "🔮 Инференс":
             "Количество образцов", min_value=1, max_value=100, value=1
         )
 
-        features = []
-        for i in range(num_samples):
-            st.write(f"**Образец {i + 1}:**")
-            sample_features = []
-            cols = st.columns(num_features)
-            for j, col in enumerate(cols):
-                with col:
-                    value = st.number_input(
-                        f"Признак {j + 1}",
-                        key=f"feature_{i}_{j}",
-                        value=0.0,
-                        step=0.1,
-                    )
-                    sample_features.append(value)
-            features.append(sample_features)
+        shape = (int(num_samples), int(num_features))
+        values = st.session_state.get("feature_values")
+        if values is None or values.shape != shape:
+            # При изменении размеров сохраняем уже введенные значения
+            base = np.zeros(shape)
+            if values is not None:
+                rows, cols = min(values.shape[0], shape[0]), min(values.shape[1], shape[1])
+                base[:rows, :cols] = values[:rows, :cols]
+            st.session_state["feature_base"] = base
+
+        edited = st.data_editor(
+            pd.DataFrame(
+                st.session_state["feature_base"],
+                index=[f"Образец {i + 1}" for i in range(shape[0])],
+                columns=[f"Признак {j + 1}" for j in range(shape[1])],
+            ),
+            num_rows="fixed",
+            use_container_width=True,
+            key=f"feature_editor_{shape[0]}_{shape[1]}",
+        )
+        values = edited.to_numpy(dtype=np.float64)
+        st.session_state["feature_values"] = values
+        features = values.tolist()
 
     elif input_method == "📄 Загрузка CSV":
         uploaded_file = st.file_uploader(
             "Загрузите CSV файл с признаками", type=["csv"]
         )
         if uploaded_file is not None:
-            df = pd.read_csv(uploaded_file)
             st.write("**📊 Предпросмотр данных:**")
-            st.dataframe(df.head())
-            features = df.values.tolist()
+            st.dataframe(pd.read_csv(uploaded_file, nrows=5))
+            uploaded_file.seek(0)
+            # Файл читается частями в момент запроса предсказаний
+            features = uploaded_file
 
     elif input_method == "📄 Загрузка JSON":
         uploaded_file = st.file_uploader(
             "Загрузите JSON файл с признаками", type=["json"]
         )
         if uploaded_file is not None:
-            data = json.load(uploaded_file)
+            data = orjson.loads(uploaded_file.getvalue())
             if isinstance(data, list):
                 if len(data) == 0:
                     st.error("❌ JSON файл пуст")
@@ -500,65 +761,257 @@ elif page == "🔮 Инференс":
             help='Пример списка списков: [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]\nПример списка объектов: [{"alcohol": 14.23, "malic_acid": 1.71, ...}, ...]',
             value='[\n  {\n    "alcohol": 14.23,\n    "malic_acid": 1.71,\n    "ash": 2.43\n  }\n]'
         )
-        if json_text:
+        # Текст разбирается заново только после изменения, результат хранится в сессии
+        if st.session_state.get("json_text_source") != json_text:
             try:
-                data = json.loads(json_text)
-                if isinstance(data, list):
-                    if len(data) == 0:
-                        st.error("❌ JSON пуст")
-                        features = None
-                    elif isinstance(data[0], list):
-                        features = data
-                        st.success(f"✅ Загружено {len(features)} образцов")
-                    elif isinstance(data[0], dict):
-                        features = data
-                        st.success(f"✅ Загружено {len(features)} образцов с именованными полями")
-                        if features:
-                            st.json({"Пример первого образца": features[0]})
-                    else:
-                        st.error("❌ Неверный формат: элементы должны быть списками или объектами")
-                        features = None
-                elif isinstance(data, dict) and "features" in data:
-                    features = data["features"]
+                st.session_state["json_text_data"] = orjson.loads(json_text) if json_text else None
+            except orjson.JSONDecodeError as e:
+                st.session_state["json_text_data"] = e
+            st.session_state["json_text_source"] = json_text
+        data = st.session_state["json_text_data"]
+        if isinstance(data, orjson.JSONDecodeError):
+            st.error(f"❌ Ошибка парсинга JSON: {data}")
+            features = None
+        elif data is not None:
+            if isinstance(data, list):
+                if len(data) == 0:
+                    st.error("❌ JSON пуст")
+                    features = None
+                elif isinstance(data[0], list):
+                    features = data
+                    st.success(f"✅ Загружено {len(features)} образцов")
+                elif isinstance(data[0], dict):
+                    features = data
+                    st.success(f"✅ Загружено {len(features)} образцов с именованными полями")
+                    if features:
+                        st.json({"Пример первого образца": features[0]})
                 else:
-                    st.error("❌ Неверный формат JSON")
+                    st.error("❌ Неверный формат: элементы должны быть списками или объектами")
                     features = None
-            except json.JSONDecodeError as e:
-                st.error(f"❌ Ошибка парсинга JSON: {e}")
+            elif isinstance(data, dict) and "features" in data:
+                features = data["features"]
+            else:
+                st.error("❌ Неверный формат JSON")
                 features = None
 
-    if features and st.button("🔮 Получить предсказания", type="primary", use_container_width=True):
-        with st.spinner("⏳ Вычисление предсказаний..."):
-            result = make_request(
-                "POST",
-                f"/api/v1/models/{model_id}/predict",
-                json={"features": features},
-            )
+    st.session_state["features"] = features
+
+
+def to_arrow_ipc(matrix: np.ndarray) -> bytes:
+    """Сериализовать матрицу признаков в Arrow IPC (stream), по столбцу на признак."""
+    batch = pa.RecordBatch.from_arrays(
+        [pa.array(column) for column in np.ascontiguousarray(matrix.T)],
+        names=[f"f{j}" for j in range(matrix.shape[1])],
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def request_predictions(model_id: str, features: Any) -> Dict[str, Any]:
+    """
+    Запросить предсказания модели.
+
+    Числовая матрица отправляется в эндпоинт predict:arrow бинарной таблицей
+    Arrow, признаки-словари и неровные списки - в JSON эндпоинт. Если API не
+    поддерживает Arrow, запоминаем это в сессии и дальше используем JSON.
+
+    Args:
+        model_id: ID модели
+        features: Матрица numpy, список списков или список словарей
+
+    Returns:
+        Ответ API или словарь с ошибкой
+    """
+    matrix = None
+    if (
+        st.session_state.get("arrow_supported", True)
+        and isinstance(features, (list, np.ndarray))
+        and len(features) > 0
+        and not isinstance(features[0], dict)
+    ):
+        try:
+            matrix = np.asarray(features, dtype=np.float64)
+        except (TypeError, ValueError):
+            matrix = None
+    if matrix is None or matrix.ndim != 2:
+        if isinstance(features, np.ndarray):
+            features = features.tolist()
+        return make_request("POST", f"/api/v1/models/{model_id}/predict", json={"features": features})
+
+    url = f"{API_BASE_URL}/api/v1/models/{model_id}/predict:arrow"
+    try:
+        response = get_http().post(
+            url,
+            data=to_arrow_ipc(matrix),
+            headers={"Content-Type": ARROW_MEDIA_TYPE},
+            timeout=_TIMEOUTS["POST"],
+        )
+        if response.status_code == 404 and response.json().get("detail") == "Not Found":
+            st.session_state["arrow_supported"] = False
+            return request_predictions(model_id, features)
+        response.raise_for_status()
+        return response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        return {"error": str(e)}
+
+
+def predict_csv_chunked(model_id: str, csv_file: io.BytesIO) -> Dict[str, Any]:
+    """
+    Получить предсказания для CSV файла, отправляя его частями.
+
+    Файл читается по PREDICT_CHUNK_SIZE строк, поэтому память не зависит
+    от размера файла, а каждый запрос к API остается ограниченным.
 
+    Args:
+        model_id: ID модели
+        csv_file: Загруженный CSV файл с признаками
+
+    Returns:
+        Ответ в формате API предсказаний или словарь с ошибкой
+    """
+    total_size = max(csv_file.seek(0, io.SEEK_END), 1)
+    csv_file.seek(0)
+    progress = st.progress(0.0, text="⏳ Вычисление предсказаний...")
+    predictions: List[float] = []
+    try:
+        for chunk in pd.read_csv(csv_file, chunksize=PREDICT_CHUNK_SIZE):
+            if chunk.empty:
+                continue
+            result = request_predictions(model_id, chunk.to_numpy(dtype=np.float64))
             if "error" in result:
-                st.error(f"❌ Ошибка: {result['error']}")
-            else:
-                st.success("✅ Предсказания получены!")
-                st.markdown("### 📊 Результаты")
-                
-                results_df = pd.DataFrame({
-                    "Образец": [f"#{i+1}" for i in range(len(result["predictions"]))],
-                    "Предсказание": result["predictions"],
-                })
-                
-                st.dataframe(results_df, use_container_width=True)
-                
-                if len(result["predictions"]) > 1:
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("📊 Количество", len(result["predictions"]))
-                    with col2:
-                        st.metric("📈 Среднее", f"{sum(result['predictions'])/len(result['predictions']):.4f}")
-                    with col3:
-                        st.metric("📉 Мин/Макс", f"{min(result['predictions']):.4f} / {max(result['predictions']):.4f}")
-                
-                if len(result["predictions"]) > 1:
-                    st.markdown("### 📈 Визуализация")
-                    st.bar_chart(results_df.set_index("Образец"))
-                else:
-                    st.markdown(f'<div class="info-box"><strong>🔮 Предсказание:</strong> {result["predictions"][0]:.4f}</div>', unsafe_allow_html=True)
+                return result
+            predictions.extend(result["predictions"])
+            progress.progress(min(csv_file.tell() / total_size, 1.0), text=f"⏳ Обработано образцов: {len(predictions)}")
+    except (ValueError, pd.errors.ParserError) as e:
+        return {"error": f"Не удалось прочитать CSV: {e}"}
+    finally:
+        progress.empty()
+    if not predictions:
+        return {"error": "CSV файл не содержит строк с признаками"}
+    return {"model_id": model_id, "predictions": predictions}
+
+
+@st.fragment
+def prediction_fragment(model_id: str):
+    """Запрос предсказаний по признакам из st.session_state["features"] и вывод результатов."""
+    if not st.button("🔮 Получить предсказания", type="primary", use_container_width=True):
+        return
+
+    features = st.session_state.get("features")
+    if not features:
+        st.warning("⚠️ Сначала введите признаки")
+        return
+
+    if isinstance(features, list):
+        with st.spinner("⏳ Вычисление предсказаний..."):
+            result = request_predictions(model_id, features)
+    else:
+        result = predict_csv_chunked(model_id, features)
+
+    if "error" in result:
+        st.error(f"❌ Ошибка: {result['error']}")
+        return
+
+    st.success("✅ Предсказания получены!")
+    st.markdown("### 📊 Результаты")
+    
+    predictions = np.asarray(result["predictions"], dtype=np.float64)
+    results_df = pd.DataFrame(
+        {"Предсказание": predictions},
+        index=pd.RangeIndex(1, predictions.size + 1, name="Образец"),
+    )
+    
+    st.dataframe(results_df, use_container_width=True)
+    
+    if predictions.size > 1:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("📊 Количество", predictions.size)
+        with col2:
+            st.metric("📈 Среднее", f"{predictions.mean():.4f}")
+        with col3:
+            st.metric("📉 Мин/Макс", f"{predictions.min():.4f} / {predictions.max():.4f}")
+    
+        st.markdown("### 📈 Визуализация")
+        st.bar_chart(results_df)
+    else:
+        st.markdown(f'<div class="info-box"><strong>🔮 Предсказание:</strong> {predictions[0]:.4f}</div>', unsafe_allow_html=True)
+
+
+PAGE_HEADERS = {
+    "📊 Датасеты": "📊 Управление датасетами",
+    "🎓 Обучение": "🎓 Обучение моделей",
+    "🔮 Инференс": "🔮 Получение предсказаний",
+}
+
+health_slot = st.container()
+
+st.sidebar.title("🤖 ML Service Dashboard")
+st.sidebar.markdown("---")
+
+page = st.sidebar.selectbox(
+    "📋 Выберите раздел",
+    list(PAGE_HEADERS),
+    format_func=lambda x: x.split(" ", 1)[1] if " " in x else x
+)
+
+# Заголовок выводится до первых запросов к API
+st.markdown(f'<h1 class="main-header">{PAGE_HEADERS[page]}</h1>', unsafe_allow_html=True)
+
+with health_slot:
+    health_banner_fragment()
+
+if page == "📊 Датасеты":
+    dataset_upload_fragment()
+
+    st.markdown("---")
+
+    dataset_list_fragment()
+
+elif page == "🎓 Обучение":
+    responses = fetch_all(["/api/v1/models/available", "/api/v1/datasets", "/api/v1/models"])
+
+    models_result = responses["/api/v1/models/available"]
+    if "error" in models_result:
+        st.error(f"❌ Ошибка: {models_result['error']}")
+        st.stop()
+
+    available_models = models_result if isinstance(models_result, list) else []
+
+    datasets_result = responses["/api/v1/datasets"]
+    datasets = (
+        datasets_result if isinstance(datasets_result, list) and "error" not in datasets_result else []
+    )
+
+    if not datasets:
+        st.warning("⚠️ Сначала загрузите датасет в разделе '📊 Датасеты'")
+        st.stop()
+
+    train_form_fragment(available_models, datasets)
+
+    st.markdown("---")
+
+    models_list_fragment()
+
+# Страница: Инференс
+elif page == "🔮 Инференс":
+    models_result = make_request("GET", "/api/v1/models")
+    if "error" in models_result:
+        st.error(f"❌ Ошибка: {models_result['error']}")
+        st.stop()
+
+    models = models_result if isinstance(models_result, list) else []
+    if not models:
+        st.warning("⚠️ Сначала обучите модель в разделе '🎓 Обучение'")
+        st.stop()
+
+    model_options = build_options(tuple((m["model_id"], m["model_type"]) for m in models))
+    selected_model = st.selectbox("🤖 Выберите модель", list(model_options.keys()))
+    model_id = model_options[selected_model]
+
+    st.markdown("---")
+
+    features_input_fragment()
+    prediction_fragment(model_id)
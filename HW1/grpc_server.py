@@ -1,10 +1,24 @@
 """Скрипт для запуска gRPC сервера."""
 
+import asyncio
+import signal
+
 from app.api.grpc.service import serve
 from app.core.config import settings
 from app.core.logging import logger
 
+
+async def main():
+    """Запустить сервер и корректно остановить его по SIGTERM."""
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    await serve(port=settings.grpc_port)
+
+
 if __name__ == "__main__":
     logger.info("Запуск gRPC сервера")
-    serve(port=settings.grpc_port)
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
 
@@ -14,7 +14,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10ml_service.proto\x12\nml_service\"\x14\n\x12HealthCheckRequest\"6\n\x13HealthCheckResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\t\"\x1b\n\x19GetAvailableModelsRequest\"1\n\x1aGetAvailableModelsResponse\x12\x13\n\x0bmodel_types\x18\x01 \x03(\t\"\x12\n\x10GetModelsRequest\"\xe6\x01\n\tModelInfo\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12\x12\n\nmodel_type\x18\x02 \x01(\t\x12\x12\n\ndataset_id\x18\x03 \x01(\t\x12\x43\n\x0fhyperparameters\x18\x04 \x03(\x0b\x32*.ml_service.ModelInfo.HyperparametersEntry\x12\x12\n\ncreated_at\x18\x05 \x01(\t\x12\x0e\n\x06status\x18\x06 \x01(\t\x1a\x36\n\x14HyperparametersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\":\n\x11GetModelsResponse\x12%\n\x06models\x18\x01 \x03(\x0b\x32\x15.ml_service.ModelInfo\"\xc0\x01\n\x11TrainModelRequest\x12\x12\n\nmodel_type\x18\x01 \x01(\t\x12\x12\n\ndataset_id\x18\x02 \x01(\t\x12K\n\x0fhyperparameters\x18\x03 \x03(\x0b\x32\x32.ml_service.TrainModelRequest.HyperparametersEntry\x1a\x36\n\x14HyperparametersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\":\n\x12TrainModelResponse\x12$\n\x05model\x18\x01 \x01(\x0b\x32\x15.ml_service.ModelInfo\"O\n\x0ePredictRequest\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12+\n\x08\x66\x65\x61tures\x18\x02 \x03(\x0b\x32\x19.ml_service.FeatureVector\"\x1f\n\rFeatureVector\x12\x0e\n\x06values\x18\x01 \x03(\x01\"8\n\x0fPredictResponse\x12\x13\n\x0bpredictions\x18\x01 \x03(\x01\x12\x10\n\x08model_id\x18\x02 \x01(\t\"\xc2\x01\n\x13RetrainModelRequest\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12\x12\n\ndataset_id\x18\x02 \x01(\t\x12M\n\x0fhyperparameters\x18\x03 \x03(\x0b\x32\x34.ml_service.RetrainModelRequest.HyperparametersEntry\x1a\x36\n\x14HyperparametersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"<\n\x14RetrainModelResponse\x12$\n\x05model\x18\x01 \x01(\x0b\x32\x15.ml_service.ModelInfo\"&\n\x12\x44\x65leteModelRequest\x12\x10\n\x08model_id\x18\x01 \x01(\t\"7\n\x13\x44\x65leteModelResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x14\n\x12GetDatasetsRequest\"j\n\x0b\x44\x61tasetInfo\x12\x12\n\ndataset_id\x18\x01 \x01(\t\x12\x10\n\x08\x66ilename\x18\x02 \x01(\t\x12\x0c\n\x04size\x18\x03 \x01(\x03\x12\x12\n\ncreated_at\x18\x04 \x01(\t\x12\x13\n\x0b\x64vc_version\x18\x05 \x01(\t\"@\n\x13GetDatasetsResponse\x12)\n\x08\x64\x61tasets\x18\x01 \x03(\x0b\x32\x17.ml_service.DatasetInfo\"I\n\x14UploadDatasetRequest\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\x0c\x12\x0e\n\x06\x66ormat\x18\x03 \x01(\t\"A\n\x15UploadDatasetResponse\x12(\n\x07\x64\x61taset\x18\x01 \x01(\x0b\x32\x17.ml_service.DatasetInfo\"*\n\x14\x44\x65leteDatasetRequest\x12\x12\n\ndataset_id\x18\x01 \x01(\t\"9\n\x15\x44\x65leteDatasetResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t2\xba\x06\n\tMLService\x12N\n\x0bHealthCheck\x12\x1e.ml_service.HealthCheckRequest\x1a\x1f.ml_service.HealthCheckResponse\x12\x63\n\x12GetAvailableModels\x12%.ml_service.GetAvailableModelsRequest\x1a&.ml_service.GetAvailableModelsResponse\x12H\n\tGetModels\x12\x1c.ml_service.GetModelsRequest\x1a\x1d.ml_service.GetModelsResponse\x12K\n\nTrainModel\x12\x1d.ml_service.TrainModelRequest\x1a\x1e.ml_service.TrainModelResponse\x12\x42\n\x07Predict\x12\x1a.ml_service.PredictRequest\x1a\x1b.ml_service.PredictResponse\x12Q\n\x0cRetrainModel\x12\x1f.ml_service.RetrainModelRequest\x1a .ml_service.RetrainModelResponse\x12N\n\x0b\x44\x65leteModel\x12\x1e.ml_service.DeleteModelRequest\x1a\x1f.ml_service.DeleteModelResponse\x12N\n\x0bGetDatasets\x12\x1e.ml_service.GetDatasetsRequest\x1a\x1f.ml_service.GetDatasetsResponse\x12T\n\rUploadDataset\x12 .ml_service.UploadDatasetRequest\x1a!.ml_service.UploadDatasetResponse\x12T\n\rDeleteDataset\x12 .ml_service.DeleteDatasetRequest\x1a!.ml_service.DeleteDatasetResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10ml_service.proto\x12\nml_service\"\x14\n\x12HealthCheckRequest\"6\n\x13HealthCheckResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\t\"\x1b\n\x19GetAvailableModelsRequest\"1\n\x1aGetAvailableModelsResponse\x12\x13\n\x0bmodel_types\x18\x01 \x03(\t\"\x12\n\x10GetModelsRequest\"\xe6\x01\n\tModelInfo\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12\x12\n\nmodel_type\x18\x02 \x01(\t\x12\x12\n\ndataset_id\x18\x03 \x01(\t\x12\x43\n\x0fhyperparameters\x18\x04 \x03(\x0b\x32*.ml_service.ModelInfo.HyperparametersEntry\x12\x12\n\ncreated_at\x18\x05 \x01(\t\x12\x0e\n\x06status\x18\x06 \x01(\t\x1a\x36\n\x14HyperparametersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\":\n\x11GetModelsResponse\x12%\n\x06models\x18\x01 \x03(\x0b\x32\x15.ml_service.ModelInfo\"\xc0\x01\n\x11TrainModelRequest\x12\x12\n\nmodel_type\x18\x01 \x01(\t\x12\x12\n\ndataset_id\x18\x02 \x01(\t\x12K\n\x0fhyperparameters\x18\x03 \x03(\x0b\x32\x32.ml_service.TrainModelRequest.HyperparametersEntry\x1a\x36\n\x14HyperparametersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\":\n\x12TrainModelResponse\x12$\n\x05model\x18\x01 \x01(\x0b\x32\x15.ml_service.ModelInfo\"O\n\x0ePredictRequest\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12+\n\x08\x66\x65\x61tures\x18\x02 \x03(\x0b\x32\x19.ml_service.FeatureVector\"\x1f\n\rFeatureVector\x12\x0e\n\x06values\x18\x01 \x03(\x01\"8\n\x0fPredictResponse\x12\x13\n\x0bpredictions\x18\x01 \x03(\x01\x12\x10\n\x08model_id\x18\x02 \x01(\t\"\xc2\x01\n\x13RetrainModelRequest\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12\x12\n\ndataset_id\x18\x02 \x01(\t\x12M\n\x0fhyperparameters\x18\x03 \x03(\x0b\x32\x34.ml_service.RetrainModelRequest.HyperparametersEntry\x1a\x36\n\x14HyperparametersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"<\n\x14RetrainModelResponse\x12$\n\x05model\x18\x01 \x01(\x0b\x32\x15.ml_service.ModelInfo\"&\n\x12\x44\x65leteModelRequest\x12\x10\n\x08model_id\x18\x01 \x01(\t\"7\n\x13\x44\x65leteModelResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x14\n\x12GetDatasetsRequest\"j\n\x0b\x44\x61tasetInfo\x12\x12\n\ndataset_id\x18\x01 \x01(\t\x12\x10\n\x08\x66ilename\x18\x02 \x01(\t\x12\x0c\n\x04size\x18\x03 \x01(\x03\x12\x12\n\ncreated_at\x18\x04 \x01(\t\x12\x13\n\x0b\x64vc_version\x18\x05 \x01(\t\"@\n\x13GetDatasetsResponse\x12)\n\x08\x64\x61tasets\x18\x01 \x03(\x0b\x32\x17.ml_service.DatasetInfo\"I\n\x14UploadDatasetRequest\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\x0c\x12\x0e\n\x06\x66ormat\x18\x03 \x01(\t\"A\n\x15UploadDatasetResponse\x12(\n\x07\x64\x61taset\x18\x01 \x01(\x0b\x32\x17.ml_service.DatasetInfo\"*\n\x14\x44\x65leteDatasetRequest\x12\x12\n\ndataset_id\x18\x01 \x01(\t\"9\n\x15\x44\x65leteDatasetResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t2\xe6\x07\n\tMLService\x12N\n\x0bHealthCheck\x12\x1e.ml_service.HealthCheckRequest\x1a\x1f.ml_service.HealthCheckResponse\x12\x63\n\x12GetAvailableModels\x12%.ml_service.GetAvailableModelsRequest\x1a&.ml_service.GetAvailableModelsResponse\x12H\n\tGetModels\x12\x1c.ml_service.GetModelsRequest\x1a\x1d.ml_service.GetModelsResponse\x12K\n\nTrainModel\x12\x1d.ml_service.TrainModelRequest\x1a\x1e.ml_service.TrainModelResponse\x12\x42\n\x07Predict\x12\x1a.ml_service.PredictRequest\x1a\x1b.ml_service.PredictResponse\x12L\n\rPredictStream\x12\x1a.ml_service.PredictRequest\x1a\x1b.ml_service.PredictResponse(\x01\x30\x01\x12Q\n\x0cRetrainModel\x12\x1f.ml_service.RetrainModelRequest\x1a .ml_service.RetrainModelResponse\x12N\n\x0b\x44\x65leteModel\x12\x1e.ml_service.DeleteModelRequest\x1a\x1f.ml_service.DeleteModelResponse\x12N\n\x0bGetDatasets\x12\x1e.ml_service.GetDatasetsRequest\x1a\x1f.ml_service.GetDatasetsResponse\x12T\n\rUploadDataset\x12 .ml_service.UploadDatasetRequest\x1a!.ml_service.UploadDatasetResponse\x12\\\n\x13UploadDatasetStream\x12 .ml_service.UploadDatasetRequest\x1a!.ml_service.UploadDatasetResponse(\x01\x12T\n\rDeleteDataset\x12 .ml_service.DeleteDatasetRequest\x1a!.ml_service.DeleteDatasetResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -80,5 +80,5 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _globals['_DELETEDATASETRESPONSE']._serialized_start=1668
   _globals['_DELETEDATASETRESPONSE']._serialized_end=1725
   _globals['_MLSERVICE']._serialized_start=1728
-  _globals['_MLSERVICE']._serialized_end=2554
+  _globals['_MLSERVICE']._serialized_end=2726
 # @@protoc_insertion_point(module_scope)
@@ -40,6 +40,11 @@ class MLServiceStub(object):
                 request_serializer=ml__service__pb2.PredictRequest.SerializeToString,
                 response_deserializer=ml__service__pb2.PredictResponse.FromString,
                 )
+        self.PredictStream = channel.stream_stream(
+                '/ml_service.MLService/PredictStream',
+                request_serializer=ml__service__pb2.PredictRequest.SerializeToString,
+                response_deserializer=ml__service__pb2.PredictResponse.FromString,
+                )
         self.RetrainModel = channel.unary_unary(
                 '/ml_service.MLService/RetrainModel',
                 request_serializer=ml__service__pb2.RetrainModelRequest.SerializeToString,
@@ -60,6 +65,11 @@ class MLServiceStub(object):
                 request_serializer=ml__service__pb2.UploadDatasetRequest.SerializeToString,
                 response_deserializer=ml__service__pb2.UploadDatasetResponse.FromString,
                 )
+        self.UploadDatasetStream = channel.stream_unary(
+                '/ml_service.MLService/UploadDatasetStream',
+                request_serializer=ml__service__pb2.UploadDatasetRequest.SerializeToString,
+                response_deserializer=ml__service__pb2.UploadDatasetResponse.FromString,
+                )
         self.DeleteDataset = channel.unary_unary(
                 '/ml_service.MLService/DeleteDataset',
                 request_serializer=ml__service__pb2.DeleteDatasetRequest.SerializeToString,
@@ -106,6 +116,13 @@ class MLServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def PredictStream(self, request_iterator, context):
+        """Получить предсказания в потоковом режиме
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def RetrainModel(self, request, context):
         """Переобучить модель
         """
@@ -134,6 +151,13 @@ class MLServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def UploadDatasetStream(self, request_iterator, context):
+        """Загрузить датасет частями
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def DeleteDataset(self, request, context):
         """Удалить датасет
         """
@@ -169,6 +193,11 @@ def add_MLServiceServicer_to_server(servicer, server):
                     request_deserializer=ml__service__pb2.PredictRequest.FromString,
                     response_serializer=ml__service__pb2.PredictResponse.SerializeToString,
             ),
+            'PredictStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.PredictStream,
+                    request_deserializer=ml__service__pb2.PredictRequest.FromString,
+                    response_serializer=ml__service__pb2.PredictResponse.SerializeToString,
+            ),
             'RetrainModel': grpc.unary_unary_rpc_method_handler(
                     servicer.RetrainModel,
                     request_deserializer=ml__service__pb2.RetrainModelRequest.FromString,
@@ -189,6 +218,11 @@ def add_MLServiceServicer_to_server(servicer, server):
                     request_deserializer=ml__service__pb2.UploadDatasetRequest.FromString,
                     response_serializer=ml__service__pb2.UploadDatasetResponse.SerializeToString,
             ),
+            'UploadDatasetStream': grpc.stream_unary_rpc_method_handler(
+                    servicer.UploadDatasetStream,
+                    request_deserializer=ml__service__pb2.UploadDatasetRequest.FromString,
+                    response_serializer=ml__service__pb2.UploadDatasetResponse.SerializeToString,
+            ),
             'DeleteDataset': grpc.unary_unary_rpc_method_handler(
                     servicer.DeleteDataset,
                     request_deserializer=ml__service__pb2.DeleteDatasetRequest.FromString,
@@ -290,6 +324,23 @@ class MLService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def PredictStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/ml_service.MLService/PredictStream',
+            ml__service__pb2.PredictRequest.SerializeToString,
+            ml__service__pb2.PredictResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def RetrainModel(request,
             target,
@@ -358,6 +409,23 @@ class MLService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def UploadDatasetStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/ml_service.MLService/UploadDatasetStream',
+            ml__service__pb2.UploadDatasetRequest.SerializeToString,
+            ml__service__pb2.UploadDatasetResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def DeleteDataset(request,
             target,